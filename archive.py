@@ -0,0 +1,276 @@
+import argparse
+import logging
+import os
+import re
+import sqlite3
+from datetime import datetime
+
+from database import Database
+
+# SQLite allows 10 attached databases by default; keep a little headroom.
+MAX_ATTACHED = 8
+
+ARCHIVE_FILE_PATTERN = re.compile(r"^expenses_(\d{4})\.db$")
+
+
+class ExpenseArchive:
+    """
+    Move old expenses, and expenses of closed projects, out of the hot
+    database into one archive database per year.
+
+    Live screens keep querying the hot database through Database. Historical
+    queries go through get_expense_history, which ATTACHes the archives and
+    UNIONs them with the hot table.
+    """
+
+    def __init__(self, db, archive_dir=None):
+        self.db = db
+        if archive_dir is None:
+            archive_dir = os.path.join(os.path.dirname(os.path.abspath(db.db_path)), "archive")
+        self.archive_dir = archive_dir
+
+    def archive_path(self, year):
+        """
+        Path of the archive database holding expenses dated in the given year.
+        """
+        return os.path.join(self.archive_dir, f"expenses_{year}.db")
+
+    def available_years(self):
+        """
+        List the years that have an archive database, oldest first.
+        """
+        if not os.path.isdir(self.archive_dir):
+            return []
+        years = []
+        for file_name in os.listdir(self.archive_dir):
+            match = ARCHIVE_FILE_PATTERN.match(file_name)
+            if match:
+                years.append(match.group(1))
+        return sorted(years)
+
+    def _archive_filter(self, cutoff_date, include_closed):
+        """
+        Build the WHERE clause selecting the expenses eligible for archiving.
+        """
+        conditions = []
+        params = []
+        if cutoff_date:
+            conditions.append("date < ?")
+            params.append(cutoff_date)
+        if include_closed:
+            conditions.append("project_id IN (SELECT id FROM projects WHERE status = 'closed')")
+        if not conditions:
+            return None, []
+        return "(" + " OR ".join(conditions) + ")", params
+
+    def _attach(self, year, alias):
+        self.db.conn.execute("ATTACH DATABASE ? AS " + alias, (self.archive_path(year),))
+
+    def _detach(self, alias):
+        self.db.conn.execute("DETACH DATABASE " + alias)
+
+    def archive_expenses(self, cutoff_date=None, include_closed=True):
+        """
+        Move eligible expenses into the per-year archive databases.
+
+        - cutoff_date: expenses dated before this day (YYYY-MM-DD) are moved.
+        - include_closed: also move every expense of a closed project.
+
+        Returns a dictionary mapping each year to the number of expenses moved.
+
+        Each year is moved in its own transaction. The copy uses the original
+        expense id as the archive key, and the archived_totals update commits
+        together with the delete from the hot table, so re-running after an
+        interruption never double-counts an expense.
+        """
+        where, params = self._archive_filter(cutoff_date, include_closed)
+        if where is None:
+            return {}
+
+        try:
+            cursor = self.db.conn.execute(
+                f"SELECT DISTINCT substr(date, 1, 4) AS year FROM expenses WHERE {where}",
+                params
+            )
+            years = sorted(row["year"] for row in cursor.fetchall())
+        except sqlite3.Error as e:
+            logging.error(f"Error selecting expenses to archive: {e}")
+            raise
+
+        os.makedirs(self.archive_dir, exist_ok=True)
+        moved = {}
+        changed_projects = set()
+        for year in years:
+            year_where = f"{where} AND substr(date, 1, 4) = ?"
+            year_params = params + [year]
+            self._attach(year, "archive")
+            try:
+                with self.db.conn:
+                    self.db.conn.execute("""
+                    CREATE TABLE IF NOT EXISTS archive.expenses (
+                        id INTEGER PRIMARY KEY,
+                        project_id INTEGER NOT NULL,
+                        description TEXT NOT NULL,
+                        amount REAL NOT NULL,
+                        category TEXT NOT NULL,
+                        date TEXT NOT NULL,
+                        archived_at TEXT NOT NULL
+                    );
+                    """)
+                    self.db.conn.execute(
+                        "CREATE INDEX IF NOT EXISTS archive.idx_expenses_project ON expenses (project_id)"
+                    )
+                    self.db.conn.execute(
+                        f"""
+                        INSERT OR REPLACE INTO archive.expenses
+                            (id, project_id, description, amount, category, date, archived_at)
+                        SELECT id, project_id, description, amount, category, date, ?
+                        FROM main.expenses WHERE {year_where}
+                        """,
+                        [datetime.now().isoformat(timespec="seconds")] + year_params
+                    )
+                    self.db.conn.execute(
+                        f"""
+                        INSERT INTO main.archived_totals (project_id, total, expense_count)
+                        SELECT project_id, SUM(amount), COUNT(*)
+                        FROM main.expenses WHERE {year_where}
+                        GROUP BY project_id
+                        ON CONFLICT (project_id) DO UPDATE SET
+                            total = total + excluded.total,
+                            expense_count = expense_count + excluded.expense_count
+                        """,
+                        year_params
+                    )
+                    cursor = self.db.conn.execute(
+                        f"SELECT DISTINCT project_id FROM main.expenses WHERE {year_where}",
+                        year_params
+                    )
+                    changed_projects.update(row["project_id"] for row in cursor.fetchall())
+                    cursor = self.db.conn.execute(
+                        f"DELETE FROM main.expenses WHERE {year_where}",
+                        year_params
+                    )
+                    moved[year] = cursor.rowcount
+                logging.info(f"Archived {moved[year]} expenses into {self.archive_path(year)}.")
+            except sqlite3.Error as e:
+                logging.error(f"Error archiving expenses for {year}: {e}")
+                raise
+            finally:
+                self._detach("archive")
+
+        for project_id in sorted(changed_projects):
+            self.db.notify_project_changed(project_id)
+        return moved
+
+    def get_project_totals(self, category=None):
+        """
+        Sum the archived expenses of every project, optionally for one category.
+        Returns a dictionary mapping project IDs to their "total" and "last_date".
+        """
+        where = " WHERE category = ?" if category is not None else ""
+        params = [category] if category is not None else []
+        years = self.available_years()
+
+        totals = {}
+        try:
+            for start in range(0, len(years), MAX_ATTACHED):
+                chunk = years[start:start + MAX_ATTACHED]
+                aliases = [f"archive_{year}" for year in chunk]
+                for year, alias in zip(chunk, aliases):
+                    self._attach(year, alias)
+                try:
+                    union = " UNION ALL ".join(
+                        f"SELECT project_id, amount, date FROM {alias}.expenses{where}" for alias in aliases
+                    )
+                    cursor = self.db.conn.execute(
+                        f"SELECT project_id, SUM(amount) AS total, MAX(date) AS last_date FROM ({union}) GROUP BY project_id",
+                        params * len(aliases)
+                    )
+                    for row in cursor.fetchall():
+                        entry = totals.setdefault(row["project_id"], {"total": 0.0, "last_date": row["last_date"]})
+                        entry["total"] += row["total"]
+                        entry["last_date"] = max(entry["last_date"], row["last_date"])
+                finally:
+                    for alias in aliases:
+                        self._detach(alias)
+        except sqlite3.Error as e:
+            logging.error(f"Error fetching archived project totals: {e}")
+            return {}
+        return totals
+
+    def get_expense_history(self, project_id=None, start_date=None, end_date=None):
+        """
+        Fetch expenses from the hot database and every relevant archive.
+
+        Only archives whose year overlaps the requested date range are
+        attached. Each row carries an 'archived' flag.
+        """
+        conditions = []
+        params = []
+        if project_id is not None:
+            conditions.append("project_id = ?")
+            params.append(project_id)
+        if start_date:
+            conditions.append("date >= ?")
+            params.append(start_date)
+        if end_date:
+            conditions.append("date <= ?")
+            params.append(end_date)
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+        columns = "id, project_id, description, amount, category, date"
+
+        years = [
+            year for year in self.available_years()
+            if (not start_date or year >= start_date[:4]) and (not end_date or year <= end_date[:4])
+        ]
+
+        history = []
+        try:
+            cursor = self.db.conn.execute(
+                f"SELECT {columns}, 0 AS archived FROM main.expenses{where}", params
+            )
+            history.extend(dict(row) for row in cursor.fetchall())
+
+            for start in range(0, len(years), MAX_ATTACHED):
+                chunk = years[start:start + MAX_ATTACHED]
+                aliases = [f"archive_{year}" for year in chunk]
+                for year, alias in zip(chunk, aliases):
+                    self._attach(year, alias)
+                try:
+                    query = " UNION ALL ".join(
+                        f"SELECT {columns}, 1 AS archived FROM {alias}.expenses{where}"
+                        for alias in aliases
+                    )
+                    cursor = self.db.conn.execute(query, params * len(aliases))
+                    history.extend(dict(row) for row in cursor.fetchall())
+                finally:
+                    for alias in aliases:
+                        self._detach(alias)
+        except sqlite3.Error as e:
+            logging.error(f"Error fetching expense history: {e}")
+            return []
+
+        history.sort(key=lambda expense: (expense["date"], expense["id"]))
+        return history
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive old and closed-project expenses.")
+    parser.add_argument("--db", default="static/data/projects.db", help="Path to the hot database.")
+    parser.add_argument("--archive-dir", default=None, help="Directory for the per-year archives.")
+    parser.add_argument("--before", default=None, help="Archive expenses dated before YYYY-MM-DD.")
+    parser.add_argument("--skip-closed", action="store_true", help="Do not archive closed projects.")
+    args = parser.parse_args()
+
+    db = Database(args.db)
+    try:
+        archive = ExpenseArchive(db, args.archive_dir)
+        moved = archive.archive_expenses(args.before, include_closed=not args.skip_closed)
+        for year, count in moved.items():
+            print(f"{year}: {count} expenses archived")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+import argparse
+import json
+import logging
+import os
+import re
+import time
+from multiprocessing import Pool
+
+from database import Database
+from reports import forecast_expenses, build_recommendations, write_expense_report
+
+# Each worker process opens its own read-only connection in _init_worker.
+_worker_db = None
+
+
+def _safe_name(name):
+    """
+    Turn a project name into something usable in a file name.
+    """
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", name).strip("_") or "project"
+
+
+def output_paths(output_dir, project):
+    """
+    Return the (report, forecast) paths written for a project.
+    """
+    base = os.path.join(output_dir, f"{project['id']}_{_safe_name(project['name'])}")
+    return f"{base}_Expense_Report.pdf", f"{base}_forecast.json"
+
+
+def _is_current(output_dir, project):
+    """
+    Tell whether both outputs of a project exist and were written from its
+    current data version.
+    """
+    report_path, forecast_path = output_paths(output_dir, project)
+    if not os.path.exists(report_path):
+        return False
+    try:
+        with open(forecast_path) as f:
+            return json.load(f).get("version") == project["version"]
+    except (OSError, ValueError):
+        return False
+
+
+def _init_worker(db_path):
+    global _worker_db
+    _worker_db = Database(db_path, read_only=True)
+
+
+def _process_project(task):
+    """
+    Write the expense report and forecast of one project.
+
+    Both files are written under a temporary name and renamed into place, so
+    an interrupted run never leaves a half-written file that resume would
+    mistake for finished work. The forecast records the project's data
+    version, which resume compares against the database.
+    """
+    project, output_dir = task
+    started = time.perf_counter()
+    report_path, forecast_path = output_paths(output_dir, project)
+    try:
+        expenses = _worker_db.get_expenses(project["id"])
+        remaining_budget = _worker_db.get_remaining_budget(project["name"])
+
+        write_expense_report(report_path + ".tmp", project, expenses, remaining_budget)
+        os.replace(report_path + ".tmp", report_path)
+
+        forecast = forecast_expenses(expenses)
+        suggestions, recommendations = build_recommendations(
+            project["cost"], remaining_budget, _worker_db.get_category_totals(project["id"]), forecast
+        )
+        forecast_data = {
+            "project_id": project["id"],
+            "project": project["name"],
+            "version": project["version"],
+            "total_budget": project["cost"],
+            "remaining_budget": remaining_budget,
+            "predicted_spending": [
+                {"date": date.strftime("%Y-%m-%d"), "amount": amount}
+                for date, amount in (forecast or [])
+            ],
+            "category_suggestions": suggestions,
+            "recommendations": recommendations,
+        }
+        with open(forecast_path + ".tmp", "w") as f:
+            json.dump(forecast_data, f, indent=2)
+        os.replace(forecast_path + ".tmp", forecast_path)
+
+        return {"project": project["name"], "status": "done", "seconds": time.perf_counter() - started}
+    except Exception as e:
+        logging.error(f"Error processing project '{project['name']}': {e}")
+        return {"project": project["name"], "status": "failed", "seconds": time.perf_counter() - started}
+
+
+def run_batch(db_path, output_dir, processes=None, resume=False):
+    """
+    Generate the report and forecast of every project using a process pool.
+
+    - processes: number of worker processes, defaults to the CPU count.
+    - resume: skip projects whose report and forecast already exist and were
+      written from the project's current data version.
+
+    Returns a summary with per-project results and overall throughput.
+    """
+    # Opening a missing file writable would create an empty database.
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"Database not found: {db_path}")
+    os.makedirs(output_dir, exist_ok=True)
+
+    # The workers' read-only connections cannot create missing tables, so the
+    # schema is brought up to date here, once, before they start.
+    db = Database(db_path)
+    try:
+        if db.conn is None:
+            raise RuntimeError(f"Cannot open database: {db_path}")
+        versions = db.get_project_versions()
+        projects = [dict(project, version=versions.get(project["id"], 0)) for project in db.get_projects()]
+    finally:
+        db.close()
+
+    tasks = []
+    skipped = 0
+    for project in projects:
+        if resume and _is_current(output_dir, project):
+            skipped += 1
+            continue
+        tasks.append((project, output_dir))
+
+    started = time.perf_counter()
+    results = []
+    if tasks:
+        with Pool(processes, initializer=_init_worker, initargs=(db_path,)) as pool:
+            for result in pool.imap_unordered(_process_project, tasks):
+                logging.info(f"{result['project']}: {result['status']} in {result['seconds']:.3f}s")
+                results.append(result)
+    elapsed = time.perf_counter() - started
+
+    done = sum(1 for result in results if result["status"] == "done")
+    summary = {
+        "projects": len(projects),
+        "skipped": skipped,
+        "done": done,
+        "failed": len(results) - done,
+        "elapsed_seconds": elapsed,
+        "projects_per_second": done / elapsed if elapsed > 0 else 0.0,
+        "results": results,
+    }
+    logging.info(
+        f"Batch finished: {done} done, {summary['failed']} failed, {skipped} skipped "
+        f"in {elapsed:.2f}s ({summary['projects_per_second']:.2f} projects/s)."
+    )
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate expense reports and forecasts for all projects.")
+    parser.add_argument("--db", default="static/data/projects.db", help="Path to the projects database.")
+    parser.add_argument("--output-dir", default="reports", help="Directory for the PDFs and forecast JSON.")
+    parser.add_argument("--processes", type=int, default=None, help="Number of worker processes.")
+    parser.add_argument("--resume", action="store_true", help="Skip projects whose outputs are up to date.")
+    args = parser.parse_args()
+
+    summary = run_batch(args.db, args.output_dir, args.processes, resume=args.resume)
+    for result in sorted(summary["results"], key=lambda result: result["project"]):
+        print(f"{result['project']}: {result['status']} ({result['seconds']:.3f}s)")
+    print(
+        f"{summary['done']} done, {summary['failed']} failed, {summary['skipped']} skipped "
+        f"in {summary['elapsed_seconds']:.2f}s ({summary['projects_per_second']:.2f} projects/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
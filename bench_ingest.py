@@ -0,0 +1,77 @@
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from database import Database
+from ingest import ExpenseWriter
+
+
+def _expense(project_id, i):
+    return (project_id, f"Expense {i}", 10.0 + i % 100, "Development", "2024-01-15")
+
+
+def bench_direct(db_path, project_id, count):
+    """
+    Insert expenses one by one with Database.add_expense (one commit each).
+    """
+    db = Database(db_path)
+    started = time.perf_counter()
+    for i in range(count):
+        db.add_expense(*_expense(project_id, i))
+    elapsed = time.perf_counter() - started
+    db.close()
+    return count / elapsed
+
+
+def bench_writer(db_path, project_id, count, producers):
+    """
+    Insert expenses from several producer threads through an ExpenseWriter.
+    """
+    per_producer = count // producers
+
+    def produce(writer, offset):
+        futures = [writer.submit(*_expense(project_id, offset + i)) for i in range(per_producer)]
+        for future in futures:
+            future.result()
+
+    with ExpenseWriter(db_path) as writer:
+        started = time.perf_counter()
+        threads = [
+            threading.Thread(target=produce, args=(writer, n * per_producer))
+            for n in range(producers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+    return per_producer * producers / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-expense commits against group commit.")
+    parser.add_argument("--direct", type=int, default=2000, help="Expenses inserted with add_expense.")
+    parser.add_argument("--queued", type=int, default=100000, help="Expenses inserted through the writer.")
+    parser.add_argument("--producers", type=int, default=4, help="Producer threads for the writer.")
+    parser.add_argument("--dir", default=None, help="Directory for the scratch database.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        db = Database(db_path)
+        db.add_project("Benchmark", 10000, 0, 0, 1, 1, 1000000, 100, "2024-01-01")
+        project_id = db.get_project_id("Benchmark")
+        db.close()
+
+        direct_rate = bench_direct(db_path, project_id, args.direct)
+        print(f"add_expense:   {direct_rate:12,.0f} expenses/s ({args.direct} expenses)")
+
+        writer_rate = bench_writer(db_path, project_id, args.queued, args.producers)
+        print(f"ExpenseWriter: {writer_rate:12,.0f} expenses/s ({args.queued} expenses, {args.producers} producers)")
+        print(f"Speed-up:      {writer_rate / direct_rate:12.1f}x")
+
+
+if __name__ == "__main__":
+    main()
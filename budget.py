@@ -1,11 +1,17 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from cocomo_calculator import COCOMOCalculator
-from database import Database
+from datetime import datetime
+from cocomo_calculator import COCOMOCalculator, HOURS_PER_MONTH
+from sensitivity import SensitivityAnalyzer, plot_tornado
+from database import get_database
 import logging
 
 cocomo = COCOMOCalculator()
-db = Database("static/data/projects.db")
+sensitivity = SensitivityAnalyzer(cocomo)
+db = get_database()
+
+# Profile selector entry for the uncalibrated COCOMO II.2000 constants.
+DEFAULT_PROFILE = "COCOMO II.2000"
 
 def setup_budget_tab(budget_frame):
     """
@@ -37,7 +43,7 @@ def setup_budget_tab(budget_frame):
 
             effort = cocomo.calculate_effort(sloc, reused, modified, scale_factors, effort_multipliers)
             schedule = cocomo.calculate_schedule(effort)
-            total_cost = effort * hourly_rate * 160
+            total_cost = effort * hourly_rate * HOURS_PER_MONTH
 
             project_details.clear()
             project_details.update({
@@ -47,7 +53,9 @@ def setup_budget_tab(budget_frame):
                 "effort": effort,
                 "schedule": schedule,
                 "cost": total_cost,
-                "hourly_rate": hourly_rate
+                "hourly_rate": hourly_rate,
+                "estimate_a": cocomo.a,
+                "estimate_b": cocomo.b
             })
 
             effort_label.config(text=f"Effort: {effort:.2f} Person-Months")
@@ -74,6 +82,12 @@ def setup_budget_tab(budget_frame):
             messagebox.showerror("Input Error", "Please provide a start date.")
             return
 
+        try:
+            datetime.strptime(start_date, "%Y-%m-%d")
+        except ValueError:
+            messagebox.showerror("Input Error", "Invalid date format. Use YYYY-MM-DD.")
+            return
+
         if "cost" not in project_details:
             messagebox.showerror("Calculation Error", "Please estimate the budget first.")
             return
@@ -88,7 +102,9 @@ def setup_budget_tab(budget_frame):
                 project_details["schedule"],
                 project_details["cost"],
                 project_details["hourly_rate"],
-                start_date
+                start_date,
+                project_details["estimate_a"],
+                project_details["estimate_b"]
             )
             messagebox.showinfo("Project Created", f"Project '{project_name}' has been created.")
             logging.info(f"Project '{project_name}' added successfully.")
@@ -96,6 +112,45 @@ def setup_budget_tab(budget_frame):
             logging.error(f"Error adding project: {e}")
             messagebox.showerror("Error", "Failed to add the project to the database.")
 
+    def select_profile(event=None):
+        """
+        Estimate with the constants of the selected calibration profile.
+        """
+        global cocomo
+        name = profile_combo.get()
+        profile = db.get_calibration_profile(name) if name != DEFAULT_PROFILE else None
+        cocomo = COCOMOCalculator.from_profile(profile) if profile else COCOMOCalculator()
+        sensitivity.calculator = cocomo
+        logging.info(f"Estimating with calibration profile '{name}'.")
+        if project_details:
+            calculate_budget()
+
+    def show_sensitivity():
+        """
+        Show a tornado chart of how much each driver alone moves the total cost.
+        """
+        try:
+            sloc = float(sloc_entry.get())
+            reused = float(reused_entry.get())
+            modified = float(modified_entry.get())
+            hourly_rate = float(hourly_rate_entry.get())
+
+            driver_combos = {
+                "Precedentedness": precedence_combo,
+                "Development Flexibility": flexibility_combo,
+                "Process Maturity": maturity_combo,
+                "Required Reliability": reliability_combo,
+                "Database Size": database_combo,
+                "Product Complexity": complexity_combo
+            }
+            baseline = {driver: combo.get() for driver, combo in driver_combos.items() if combo.get()}
+
+            baseline_cost, rows = sensitivity.tornado(sloc, reused, modified, hourly_rate, baseline)
+            plot_tornado(baseline_cost, rows, title="Cost Sensitivity by Driver")
+        except Exception as e:
+            logging.error(f"Error in sensitivity analysis: {e}")
+            messagebox.showerror("Error", "Invalid inputs for sensitivity analysis.")
+
     # Widgets for the Budget Tab
     tk.Label(budget_frame, text="Software Size (SLOC):").grid(row=0, column=0, padx=10, pady=5)
     sloc_entry = tk.Entry(budget_frame)
@@ -159,3 +214,19 @@ def setup_budget_tab(budget_frame):
 
     cost_label = tk.Label(budget_frame, text="Total Cost: $0.00")
     cost_label.grid(row=16, column=0, columnspan=2, pady=5)
+
+    sensitivity_button = tk.Button(budget_frame, text="Sensitivity Analysis", command=show_sensitivity)
+    sensitivity_button.grid(row=17, column=0, columnspan=2, pady=10)
+
+    tk.Label(budget_frame, text="Calibration Profile:").grid(row=18, column=0, padx=10, pady=5)
+    profile_names = db.get_calibration_profile_names()
+    profile_combo = ttk.Combobox(
+        budget_frame,
+        values=[DEFAULT_PROFILE] + profile_names,
+        # Pick up profiles calibrated while the application is running
+        postcommand=lambda: profile_combo.config(values=[DEFAULT_PROFILE] + db.get_calibration_profile_names())
+    )
+    profile_combo.grid(row=18, column=1, padx=10, pady=5)
+    profile_combo.set("default" if "default" in profile_names else DEFAULT_PROFILE)
+    profile_combo.bind("<<ComboboxSelected>>", select_profile)
+    select_profile()
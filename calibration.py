@@ -0,0 +1,189 @@
+import argparse
+import logging
+from datetime import date
+
+import numpy as np
+from scipy.optimize import least_squares
+
+from archive import ExpenseArchive
+from cocomo_calculator import COCOMOCalculator, DEFAULT_CONSTANTS, HOURS_PER_MONTH
+from database import Database
+
+DAYS_PER_MONTH = 365.25 / 12
+
+
+def load_history(db, category=None, archive=None):
+    """
+    Collect estimated and actual figures of every closed project as arrays.
+
+    Actual spend includes archived expenses. When category is given, only the
+    expenses of that category count as actual spend. Projects estimated before
+    their effort constants were recorded count as estimated with the defaults.
+    """
+    archive = archive or ExpenseArchive(db)
+    hot = db.get_project_expense_totals(category)
+    archived = archive.get_project_totals(category)
+    calculator = COCOMOCalculator()
+
+    rows = []
+    for project in db.get_projects():
+        if project["status"] != "closed":
+            continue
+        totals = [entry for entry in (hot.get(project["id"]), archived.get(project["id"])) if entry]
+        actual_cost = sum(entry["total"] for entry in totals)
+        if actual_cost <= 0 or project["effort"] <= 0 or project["hourly_rate"] <= 0:
+            continue
+
+        months = np.nan
+        if project["start_date"]:
+            last_date = max(entry["last_date"] for entry in totals)
+            try:
+                start = date.fromisoformat(project["start_date"])
+                months = (date.fromisoformat(last_date) - start).days / DAYS_PER_MONTH
+            except ValueError:
+                # Start dates are free text; a project without a usable one
+                # still counts towards the effort fit.
+                logging.warning(f"Ignoring the duration of '{project['name']}': invalid date.")
+
+        rows.append((
+            calculator.adjusted_kloc(project["sloc"], project["reused"], project["modified"]),
+            project["effort"],
+            actual_cost / (project["hourly_rate"] * HOURS_PER_MONTH),
+            months,
+            project["estimate_a"] if project["estimate_a"] is not None else DEFAULT_CONSTANTS["a"],
+            project["estimate_b"] if project["estimate_b"] is not None else DEFAULT_CONSTANTS["b"],
+        ))
+
+    data = np.array(rows, dtype=float).reshape(-1, 6)
+    return {
+        "adjusted_kloc": data[:, 0],
+        "estimated_effort": data[:, 1],
+        "actual_effort": data[:, 2],
+        "actual_months": data[:, 3],
+        "estimate_a": data[:, 4],
+        "estimate_b": data[:, 5],
+    }
+
+
+def fit_effort(adjusted_kloc, estimated_effort, actual_effort,
+               estimate_a=DEFAULT_CONSTANTS["a"], estimate_b=DEFAULT_CONSTANTS["b"]):
+    """
+    Fit the effort constants a and b to actual effort.
+
+    Projects do not store their driver ratings, so the combined driver factor
+    of each project is recovered from its estimate and the constants it was
+    made with (estimate_a, estimate_b; scalars or one value per project):
+    effort = a * kloc^b * driver_factor. The fit minimizes the relative
+    error, so large projects do not dominate.
+
+    Returns (a, b, rms relative error).
+    """
+    log_kloc = np.log(adjusted_kloc)
+    log_driver_factor = np.log(estimated_effort) - np.log(estimate_a) - estimate_b * log_kloc
+
+    def residuals(params):
+        log_a, b = params
+        predicted = np.exp(log_a + b * log_kloc + log_driver_factor)
+        return predicted / actual_effort - 1
+
+    # Start from the log-linear least squares solution.
+    design = np.column_stack([np.ones_like(log_kloc), log_kloc])
+    target = np.log(actual_effort) - log_driver_factor
+    start = np.linalg.lstsq(design, target, rcond=None)[0]
+
+    result = least_squares(residuals, start, method="lm")
+    log_a, b = result.x
+    return float(np.exp(log_a)), float(b), float(np.sqrt(np.mean(result.fun ** 2)))
+
+
+def fit_schedule(actual_effort, actual_months):
+    """
+    Fit the schedule constants c and d so that months = c * effort^d.
+
+    Returns (c, d, rms relative error).
+    """
+    log_effort = np.log(actual_effort)
+
+    def residuals(params):
+        log_c, d = params
+        return np.exp(log_c + d * log_effort) / actual_months - 1
+
+    design = np.column_stack([np.ones_like(log_effort), log_effort])
+    start = np.linalg.lstsq(design, np.log(actual_months), rcond=None)[0]
+
+    result = least_squares(residuals, start, method="lm")
+    log_c, d = result.x
+    return float(np.exp(log_c)), float(d), float(np.sqrt(np.mean(result.fun ** 2)))
+
+
+def calibrate(db, name="default", category=None, archive=None, save=True):
+    """
+    Fit the COCOMO constants from the closed projects and store them as a new
+    version of the named calibration profile.
+
+    Constants that cannot be fitted (fewer than three usable projects) keep
+    their default values. Returns the profile as a dictionary.
+    """
+    history = load_history(db, category, archive)
+    profile = dict(DEFAULT_CONSTANTS, name=name, project_count=len(history["actual_effort"]),
+                   effort_error=None, schedule_error=None)
+
+    if profile["project_count"] >= 3:
+        profile["a"], profile["b"], profile["effort_error"] = fit_effort(
+            history["adjusted_kloc"], history["estimated_effort"], history["actual_effort"],
+            history["estimate_a"], history["estimate_b"]
+        )
+    else:
+        logging.warning(f"Not enough closed projects to calibrate effort for '{name}'.")
+
+    has_duration = history["actual_months"] > 0
+    if np.count_nonzero(has_duration) >= 3:
+        profile["c"], profile["d"], profile["schedule_error"] = fit_schedule(
+            history["actual_effort"][has_duration], history["actual_months"][has_duration]
+        )
+    else:
+        logging.warning(f"Not enough project durations to calibrate the schedule for '{name}'.")
+
+    if save:
+        profile["version"] = db.save_calibration_profile(
+            name, profile["a"], profile["b"], profile["c"], profile["d"],
+            profile["project_count"], profile["effort_error"], profile["schedule_error"]
+        )
+    return profile
+
+
+def calibrate_categories(db, archive=None, save=True):
+    """
+    Calibrate one profile per expense category, named "category:<name>".
+    """
+    return [
+        calibrate(db, f"category:{category}", category, archive, save)
+        for category in db.get_categories()
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit COCOMO constants from closed projects.")
+    parser.add_argument("--db", default="static/data/projects.db", help="Path to the projects database.")
+    parser.add_argument("--name", default="default", help="Name of the calibration profile.")
+    parser.add_argument("--category", default=None, help="Only count expenses of this category.")
+    parser.add_argument("--per-category", action="store_true", help="Fit one profile per expense category.")
+    args = parser.parse_args()
+
+    db = Database(args.db)
+    try:
+        if args.per_category:
+            profiles = calibrate_categories(db)
+        else:
+            profiles = [calibrate(db, args.name, args.category)]
+        for profile in profiles:
+            print(
+                f"{profile['name']} v{profile['version']}: a={profile['a']:.4f} b={profile['b']:.4f} "
+                f"c={profile['c']:.4f} d={profile['d']:.4f} ({profile['project_count']} projects)"
+            )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,21 @@
+# Published COCOMO II.2000 constants, used until a calibration profile replaces them.
+DEFAULT_CONSTANTS = {"a": 2.94, "b": 0.91, "c": 3.67, "d": 0.28}
+
+# Working hours in a person-month, used to turn effort into cost.
+HOURS_PER_MONTH = 160
+
+
 class COCOMOCalculator:
-    def __init__(self):
+    def __init__(self, a=DEFAULT_CONSTANTS["a"], b=DEFAULT_CONSTANTS["b"],
+                 c=DEFAULT_CONSTANTS["c"], d=DEFAULT_CONSTANTS["d"]):
+        """
+        - a, b: effort coefficient and base exponent.
+        - c, d: schedule coefficient and exponent.
+        """
+        self.a = a
+        self.b = b
+        self.c = c
+        self.d = d
         self.scale_factors = {
             "Nominal": 1.0,
             "Very Low": 0.75,
@@ -16,6 +32,23 @@ class COCOMOCalculator:
             "Very High": 1.4,
             "Extra High": 1.65
         }
+        # Drivers rated in the Budget tab, by table.
+        self.scale_factor_drivers = ["Precedentedness", "Development Flexibility", "Process Maturity"]
+        self.effort_multiplier_drivers = ["Required Reliability", "Database Size", "Product Complexity"]
+
+    @classmethod
+    def from_profile(cls, profile):
+        """
+        Create a calculator using the constants of a calibration profile.
+        """
+        return cls(profile["a"], profile["b"], profile["c"], profile["d"])
+
+    def adjusted_kloc(self, sloc, reused, modified):
+        """
+        Size in thousands of lines, adjusted for reused and modified code.
+        """
+        kloc = sloc / 1000
+        return kloc * (1 - reused / 100 + 0.4 * reused / 100 * (modified / 100))
 
     def calculate_effort(self, sloc, reused, modified, scale_factors, effort_multipliers):
         """
@@ -25,25 +58,25 @@ class COCOMOCalculator:
         - modified: Percentage of modified code.
         - scale_factors: Dictionary of scale factors.
         - effort_multipliers: Dictionary of cost drivers.
+        Driver values may also be NumPy arrays; they broadcast against each other.
         """
-        kloc = sloc / 1000
         scale_factor_sum = sum(scale_factors.values())
-        exponent = 0.91 + 0.01 * scale_factor_sum
+        exponent = self.b + 0.01 * scale_factor_sum
 
         # Adjust for reused code
-        adjusted_kloc = kloc * (1 - reused / 100 + 0.4 * reused / 100 * (modified / 100))
+        adjusted_kloc = self.adjusted_kloc(sloc, reused, modified)
 
         # Calculate effort
         product_effort_multiplier = 1
         for multiplier in effort_multipliers.values():
-            product_effort_multiplier *= multiplier
+            product_effort_multiplier = product_effort_multiplier * multiplier
 
-        effort = 2.94 * (adjusted_kloc ** exponent) * product_effort_multiplier
+        effort = self.a * (adjusted_kloc ** exponent) * product_effort_multiplier
         return effort
 
     def calculate_schedule(self, effort):
         """
         Calculate the schedule (duration) in months.
         """
-        schedule = 3.67 * (effort ** 0.28)
+        schedule = self.c * (effort ** self.d)
         return schedule
\ No newline at end of file
@@ -1,36 +1,97 @@
 import tkinter as tk
-from database import Database
+from database import get_database
 import logging
+from utils import deliver_changes
 
-db = Database("static/data/projects.db")
+db = get_database()
 
 def setup_dashboard_tab(dashboard_frame):
     """
     Set up the Dashboard Tab.
     """
+    # Project ID -> summary currently displayed, in listbox order.
+    summaries = {}
+    loaded_versions = {}
+
+    def format_summary(summary):
+        return (
+            f"Project: {summary['name']}, "
+            f"Total Budget: ${summary['cost']:.2f}, "
+            f"Remaining: ${summary['remaining']:.2f}"
+        )
+
+    def show_summary(summary):
+        """
+        Insert or replace the listbox row of a single project.
+        """
+        if summary["id"] in summaries:
+            index = list(summaries).index(summary["id"])
+            dashboard_list.delete(index)
+            dashboard_list.insert(index, format_summary(summary))
+        else:
+            dashboard_list.insert(tk.END, format_summary(summary))
+        summaries[summary["id"]] = summary
+
     def update_dashboard():
         """
         Update the dashboard with project summaries.
+        Nothing is rebuilt when no project changed since the last refresh.
         """
         try:
-            project_summaries = db.get_projects()
+            versions = db.get_project_versions()
+            if summaries and versions == loaded_versions:
+                logging.info("Dashboard is up to date.")
+                return
+
+            project_summaries = db.get_project_summaries()
             dashboard_list.delete(0, tk.END)
+            summaries.clear()
 
-            for project in project_summaries:
-                project_status = (
-                    f"Project: {project['name']}, "
-                    f"Total Budget: ${project['cost']:.2f}, "
-                    f"Remaining: ${db.get_remaining_budget(project['name']):.2f}"
-                )
-                dashboard_list.insert(tk.END, project_status)
+            for summary in project_summaries:
+                show_summary(summary)
+            loaded_versions.clear()
+            loaded_versions.update(versions)
             logging.info("Dashboard updated successfully.")
         except Exception as e:
             logging.error(f"Error updating dashboard: {e}")
 
+    def apply_change(event):
+        """
+        Apply a database change event to the displayed rows.
+        """
+        project_id = event["project_id"]
+        loaded = loaded_versions.get(project_id, 0)
+        if event["version"] <= loaded:
+            # A refresh already loaded this change.
+            return
+
+        if event["type"] == "project_added":
+            project = event["project"]
+            show_summary({"id": project_id, "name": project["name"], "cost": project["cost"], "remaining": project["cost"]})
+        elif event["type"] == "expenses_added" and project_id in summaries:
+            # Every inserted expense bumps the version once; any other gap means
+            # a write we have not seen, so leave the next refresh to rebuild.
+            if event["version"] != loaded + len(event["expenses"]):
+                loaded_versions.pop(project_id, None)
+                return
+            summary = dict(summaries[project_id])
+            summary["remaining"] -= sum(expense["amount"] for expense in event["expenses"])
+            show_summary(summary)
+        elif event["type"] == "project_changed" and project_id in summaries:
+            project = db.get_project_details(project_id)
+            summary = dict(summaries[project_id], cost=project["cost"])
+            summary["remaining"] = db.get_remaining_budget(project["name"])
+            show_summary(summary)
+        else:
+            return
+        loaded_versions[project_id] = event["version"]
+
     # Dashboard Widgets
     tk.Label(dashboard_frame, text="Project Overview:").pack(pady=10)
     dashboard_list = tk.Listbox(dashboard_frame, width=80, height=15)
     dashboard_list.pack(pady=10)
 
     update_dashboard_button = tk.Button(dashboard_frame, text="Refresh Dashboard", command=update_dashboard)
-    update_dashboard_button.pack(pady=10)
\ No newline at end of file
+    update_dashboard_button.pack(pady=10)
+
+    deliver_changes(dashboard_frame, db, apply_change)
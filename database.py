@@ -1,20 +1,88 @@
+import os
+import re
 import sqlite3
 import logging
+import threading
+from pathlib import Path
+
+# Change listeners, keyed by database file so that every Database instance
+# (and every thread, such as the ExpenseWriter) writing to the same file
+# notifies the same subscribers.
+_listeners = {}
+_listeners_lock = threading.Lock()
+
+# Bump whenever _initialize_tables changes, so existing files get migrated.
+SCHEMA_VERSION = 3
+
+# Database used by the GUI tabs; PROJECT_BUDGET_DB overrides the location.
+DEFAULT_DB_PATH = os.environ.get("PROJECT_BUDGET_DB", "static/data/projects.db")
+
+_shared_database = None
+
+
+def get_database():
+    """
+    Return the Database shared by the application modules.
+    It does not connect until it is first used.
+    """
+    global _shared_database
+    if _shared_database is None:
+        _shared_database = Database(DEFAULT_DB_PATH)
+    return _shared_database
+
+
+def configure_database(db_path):
+    """
+    Point the shared Database at another file, e.g. ":memory:" in tests.
+    Modules that already hold the shared instance see the new location.
+    """
+    global DEFAULT_DB_PATH
+    DEFAULT_DB_PATH = db_path
+    database = get_database()
+    database.close()
+    database.db_path = db_path
+    database._listener_key = database._make_listener_key()
+    return database
+
 
 class Database:
-    def __init__(self, db_path):
+    def __init__(self, db_path, read_only=False):
         self.db_path = db_path
-        self.conn = None
-        self._connect()
+        self.read_only = read_only
+        self._conn = None
+        self._has_search_index = None
+        self._listener_key = self._make_listener_key()
+
+    def _make_listener_key(self):
+        if self.db_path == ":memory:" or self.db_path.startswith("file:"):
+            return f"{self.db_path}#{id(self)}"
+        return os.path.abspath(self.db_path)
+
+    @property
+    def conn(self):
+        """
+        The SQLite connection, opened on first access.
+        """
+        if self._conn is None:
+            self._connect()
+        return self._conn
 
     def _connect(self):
         """
         Connect to the SQLite database.
+
+        Read-only connections skip table initialization, so they can be opened
+        by background workers without taking the write lock.
         """
         try:
-            self.conn = sqlite3.connect(self.db_path, timeout=10)
-            self.conn.row_factory = sqlite3.Row  # Enable dictionary-like row access
-            self._initialize_tables()
+            if self.read_only:
+                uri = Path(self.db_path).resolve().as_uri() + "?mode=ro"
+                self._conn = sqlite3.connect(uri, timeout=10, uri=True)
+            else:
+                self._conn = sqlite3.connect(self.db_path, timeout=10)
+            self._conn.row_factory = sqlite3.Row  # Enable dictionary-like row access
+            if not self.read_only:
+                self._initialize_tables()
             logging.info(f"Connected to database: {self.db_path}")
         except sqlite3.Error as e:
             logging.error(f"Error connecting to database: {e}")
@@ -22,8 +90,12 @@ class Database:
     def _initialize_tables(self):
         """
         Initialize the projects, expenses, and categories tables if they don't already exist.
+        Skipped when the file's user_version shows it already has the current schema.
         """
         try:
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+                return
+
             # Projects table
             self.conn.execute("""
             CREATE TABLE IF NOT EXISTS projects (
@@ -36,9 +108,16 @@ class Database:
                 schedule REAL NOT NULL,
                 cost REAL NOT NULL,
                 hourly_rate REAL NOT NULL,
-                start_date TEXT NOT NULL
+                start_date TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'active',
+                estimate_a REAL,
+                estimate_b REAL
             );
             """)
+            self._ensure_column("projects", "status", "TEXT NOT NULL DEFAULT 'active'")
+            # COCOMO effort constants the estimate was made with; NULL means the defaults
+            self._ensure_column("projects", "estimate_a", "REAL")
+            self._ensure_column("projects", "estimate_b", "REAL")
 
             # Expenses table
             self.conn.execute("""
@@ -52,6 +131,9 @@ class Database:
                 FOREIGN KEY (project_id) REFERENCES projects (id)
             );
             """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_expenses_project ON expenses (project_id, date)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_expenses_date ON expenses (date)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_expenses_category ON expenses (category, date)")
 
             # Categories table
             self.conn.execute("""
@@ -61,13 +143,119 @@ class Database:
             );
             """)
 
+            # Running totals of expenses moved out to the archive databases
+            self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS archived_totals (
+                project_id INTEGER PRIMARY KEY,
+                total REAL NOT NULL DEFAULT 0,
+                expense_count INTEGER NOT NULL DEFAULT 0,
+                FOREIGN KEY (project_id) REFERENCES projects (id)
+            );
+            """)
+
+            # Versioned COCOMO constants fitted from completed projects
+            self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS calibration_profiles (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                a REAL NOT NULL,
+                b REAL NOT NULL,
+                c REAL NOT NULL,
+                d REAL NOT NULL,
+                project_count INTEGER NOT NULL,
+                effort_error REAL,
+                schedule_error REAL,
+                created_at TEXT NOT NULL,
+                UNIQUE (name, version)
+            );
+            """)
+
+            # Per-project data version, bumped by triggers on every write so
+            # that views can tell whether anything changed since they loaded.
+            self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS project_versions (
+                project_id INTEGER PRIMARY KEY,
+                version INTEGER NOT NULL DEFAULT 0
+            );
+            """)
+            for trigger, event, table, row in [
+                ("trg_projects_insert_version", "INSERT", "projects", "NEW.id"),
+                ("trg_projects_update_version", "UPDATE", "projects", "NEW.id"),
+                ("trg_expenses_insert_version", "INSERT", "expenses", "NEW.project_id"),
+                ("trg_expenses_update_version", "UPDATE", "expenses", "NEW.project_id"),
+                ("trg_expenses_delete_version", "DELETE", "expenses", "OLD.project_id"),
+            ]:
+                self.conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {trigger} AFTER {event} ON {table}
+                BEGIN
+                    INSERT INTO project_versions (project_id, version) VALUES ({row}, 1)
+                    ON CONFLICT (project_id) DO UPDATE SET version = version + 1;
+                END;
+                """)
+
             # Prepopulate categories if empty
             self._prepopulate_categories()
 
+            # Last, so that a build without FTS5 still gets every other table
+            self._initialize_search()
+
+            self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
             self.conn.commit()
         except sqlite3.Error as e:
             logging.error(f"Error initializing database tables: {e}")
 
+    def _initialize_search(self):
+        """
+        Create the full-text index over expense descriptions, kept in sync by triggers.
+        SQLite builds without FTS5 skip it and search_expenses falls back to LIKE.
+        """
+        try:
+            fts_exists = self.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'expenses_fts'"
+            ).fetchone()
+            self.conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS expenses_fts USING fts5(
+                description,
+                content = 'expenses',
+                content_rowid = 'id',
+                prefix = '2 3'
+            );
+            """)
+            self.conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_expenses_fts_insert AFTER INSERT ON expenses
+            BEGIN
+                INSERT INTO expenses_fts (rowid, description) VALUES (NEW.id, NEW.description);
+            END;
+            """)
+            self.conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_expenses_fts_delete AFTER DELETE ON expenses
+            BEGIN
+                INSERT INTO expenses_fts (expenses_fts, rowid, description) VALUES ('delete', OLD.id, OLD.description);
+            END;
+            """)
+            self.conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_expenses_fts_update AFTER UPDATE OF description ON expenses
+            BEGIN
+                INSERT INTO expenses_fts (expenses_fts, rowid, description) VALUES ('delete', OLD.id, OLD.description);
+                INSERT INTO expenses_fts (rowid, description) VALUES (NEW.id, NEW.description);
+            END;
+            """)
+            if not fts_exists:
+                # Index the expenses recorded before the search table existed
+                self.conn.execute("INSERT INTO expenses_fts (expenses_fts) VALUES ('rebuild')")
+        except sqlite3.Error as e:
+            logging.warning(f"Full-text search unavailable, falling back to LIKE: {e}")
+
+    def _ensure_column(self, table, column, definition):
+        """
+        Add a column to an existing table if it was created by an older schema.
+        """
+        columns = [row["name"] for row in self.conn.execute(f"PRAGMA table_info({table})")]
+        if column not in columns:
+            self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+            logging.info(f"Added column '{column}' to table '{table}'.")
+
     def _prepopulate_categories(self):
         """
         Prepopulate the categories table with default categories.
@@ -82,30 +270,39 @@ class Database:
         except sqlite3.Error as e:
             logging.error(f"Error prepopulating categories: {e}")
 
-    def add_project(self, name, sloc, reused, modified, effort, schedule, cost, hourly_rate, start_date):
+    def add_project(self, name, sloc, reused, modified, effort, schedule, cost, hourly_rate, start_date,
+                    estimate_a=None, estimate_b=None):
         """
         Add a new project to the database.
+        - estimate_a, estimate_b: COCOMO effort constants the estimate was made
+          with, when they differ from the defaults.
         """
         try:
-            self.conn.execute(
+            cursor = self.conn.execute(
                 """
-                INSERT INTO projects (name, sloc, reused, modified, effort, schedule, cost, hourly_rate, start_date)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                INSERT INTO projects (name, sloc, reused, modified, effort, schedule, cost, hourly_rate, start_date,
+                                      estimate_a, estimate_b)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """,
-                (name, sloc, reused, modified, effort, schedule, cost, hourly_rate, start_date),
+                (name, sloc, reused, modified, effort, schedule, cost, hourly_rate, start_date, estimate_a, estimate_b),
             )
             self.conn.commit()
+            project_id = cursor.lastrowid
             logging.info(f"Project '{name}' added successfully.")
         except sqlite3.Error as e:
             logging.error(f"Error adding project: {e}")
             raise
+        # Only fetch the new row back when someone is listening
+        if self._has_listeners():
+            self._publish("project_added", project_id, project=self.get_project_details(project_id))
+        return project_id
 
     def add_expense(self, project_id, description, amount, category, date):
         """
         Add an expense to the database.
         """
         try:
-            self.conn.execute(
+            cursor = self.conn.execute(
                 """
                 INSERT INTO expenses (project_id, description, amount, category, date)
                 VALUES (?, ?, ?, ?, ?)
@@ -113,10 +310,139 @@ class Database:
                 (project_id, description, amount, category, date),
             )
             self.conn.commit()
+            expense_id = cursor.lastrowid
             logging.info(f"Expense added to project ID {project_id}.")
         except sqlite3.Error as e:
             logging.error(f"Error adding expense: {e}")
             raise
+        self._publish_expenses([(expense_id, (project_id, description, amount, category, date))])
+        return expense_id
+
+    def add_expenses(self, expenses):
+        """
+        Add several expenses in a single transaction.
+        - expenses: iterable of (project_id, description, amount, category, date) tuples.
+        Returns the ids of the new expenses, in order.
+        """
+        expenses = list(expenses)
+        try:
+            expense_ids = []
+            for expense in expenses:
+                cursor = self.conn.execute(
+                    """
+                    INSERT INTO expenses (project_id, description, amount, category, date)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    expense,
+                )
+                expense_ids.append(cursor.lastrowid)
+            self.conn.commit()
+            logging.info(f"{len(expense_ids)} expenses added in one transaction.")
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            logging.error(f"Error adding expenses: {e}")
+            raise
+        self._publish_expenses(list(zip(expense_ids, expenses)))
+        return expense_ids
+
+    def subscribe(self, callback):
+        """
+        Register a callback called with an event dictionary after every write.
+
+        Events have a "type" ("project_added", "expenses_added" or
+        "project_changed"), the "project_id" and its new "version". Added
+        projects carry the "project" row and added expenses the list of
+        "expenses" rows, so views can apply the change without reloading.
+        "project_changed" means the project must be reloaded.
+
+        Callbacks run on the thread that performed the write.
+        """
+        with _listeners_lock:
+            _listeners.setdefault(self._listener_key, []).append(callback)
+
+    def unsubscribe(self, callback):
+        """
+        Remove a callback registered with subscribe.
+        """
+        with _listeners_lock:
+            callbacks = _listeners.get(self._listener_key, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+
+    def notify_project_changed(self, project_id):
+        """
+        Publish a "project_changed" event for writes that have no finer-grained event.
+        """
+        self._publish("project_changed", project_id)
+
+    def _has_listeners(self):
+        """
+        Tell whether anything is subscribed to this database.
+        """
+        with _listeners_lock:
+            return bool(_listeners.get(self._listener_key))
+
+    def _publish(self, event_type, project_id, **data):
+        """
+        Notify the subscribers of this database about a committed write.
+        """
+        with _listeners_lock:
+            callbacks = list(_listeners.get(self._listener_key, []))
+        if not callbacks:
+            return
+
+        event = {"type": event_type, "project_id": project_id, "version": self.get_project_version(project_id)}
+        event.update(data)
+        for callback in callbacks:
+            try:
+                callback(event)
+            except Exception as e:
+                logging.error(f"Error in change listener: {e}")
+
+    def _publish_expenses(self, added):
+        """
+        Publish one "expenses_added" event per project for (id, expense) pairs.
+        """
+        if not self._has_listeners():
+            return
+        by_project = {}
+        for expense_id, (project_id, description, amount, category, date) in added:
+            by_project.setdefault(project_id, []).append({
+                "id": expense_id,
+                "project_id": project_id,
+                "description": description,
+                "amount": amount,
+                "category": category,
+                "date": date,
+            })
+        for project_id, expenses in by_project.items():
+            self._publish("expenses_added", project_id, expenses=expenses)
+
+    def get_project_version(self, project_id):
+        """
+        Return the data version of a project; it changes on every write to the project or its expenses.
+        """
+        try:
+            cursor = self.conn.execute(
+                "SELECT version FROM project_versions WHERE project_id = ?",
+                (project_id,)
+            )
+            row = cursor.fetchone()
+            return row["version"] if row else 0
+        except sqlite3.Error as e:
+            logging.error(f"Error fetching project version: {e}")
+            return 0
+
+    def get_project_versions(self):
+        """
+        Return a dictionary mapping every project ID to its data version.
+        """
+        try:
+            cursor = self.conn.execute("SELECT project_id, version FROM project_versions")
+            return {row["project_id"]: row["version"] for row in cursor.fetchall()}
+        except sqlite3.Error as e:
+            logging.error(f"Error fetching project versions: {e}")
+            return {}
 
     def get_projects(self):
         """
@@ -156,30 +482,73 @@ class Database:
             logging.error(f"Error fetching project ID: {e}")
             return None
 
+    def close_project(self, project_id):
+        """
+        Mark a project as closed so its expenses become eligible for archiving.
+        """
+        try:
+            self.conn.execute("UPDATE projects SET status = 'closed' WHERE id = ?", (project_id,))
+            self.conn.commit()
+            logging.info(f"Project ID {project_id} closed.")
+        except sqlite3.Error as e:
+            logging.error(f"Error closing project: {e}")
+            raise
+        self.notify_project_changed(project_id)
+
     def get_remaining_budget(self, project_name):
         """
         Calculate the remaining budget for a given project.
+
+        Expenses already moved to the archive databases are counted through
+        the archived_totals table, so archiving never changes the result.
         """
         try:
-            project_id = self.get_project_id(project_name)
-            if not project_id:
-                return 0.0
-
-            # Get total budget
-            cursor = self.conn.execute("SELECT cost FROM projects WHERE id = ?", (project_id,))
+            cursor = self.conn.execute(
+                """
+                SELECT p.cost,
+                       (SELECT SUM(amount) FROM expenses WHERE project_id = p.id) AS total_expenses,
+                       (SELECT total FROM archived_totals WHERE project_id = p.id) AS archived_expenses
+                FROM projects p
+                WHERE p.name = ?
+                """,
+                (project_name,)
+            )
             row = cursor.fetchone()
-            total_budget = row["cost"] if row else 0.0
+            if not row:
+                return 0.0
 
-            # Calculate total expenses
-            cursor = self.conn.execute("SELECT SUM(amount) as total_expenses FROM expenses WHERE project_id = ?", (project_id,))
-            row = cursor.fetchone()
             total_expenses = row["total_expenses"] if row["total_expenses"] else 0.0
+            archived_expenses = row["archived_expenses"] if row["archived_expenses"] else 0.0
 
-            return total_budget - total_expenses
+            return row["cost"] - total_expenses - archived_expenses
         except sqlite3.Error as e:
             logging.error(f"Error calculating remaining budget: {e}")
             return 0.0
 
+    def get_project_summaries(self):
+        """
+        Fetch the budget, remaining budget and data version of every project in one query.
+        """
+        try:
+            cursor = self.conn.execute(
+                """
+                SELECT p.id, p.name, p.cost,
+                       p.cost - COALESCE(e.total, 0) - COALESCE(a.total, 0) AS remaining,
+                       COALESCE(v.version, 0) AS version
+                FROM projects p
+                LEFT JOIN (
+                    SELECT project_id, SUM(amount) AS total FROM expenses GROUP BY project_id
+                ) e ON e.project_id = p.id
+                LEFT JOIN archived_totals a ON a.project_id = p.id
+                LEFT JOIN project_versions v ON v.project_id = p.id
+                ORDER BY p.id
+                """
+            )
+            return [dict(row) for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            logging.error(f"Error fetching project summaries: {e}")
+            return []
+
     def get_expenses(self, project_id):
         """
         Fetch all expenses for a given project ID.
@@ -191,6 +560,207 @@ class Database:
             logging.error(f"Error fetching expenses: {e}")
             return []
 
+    def get_category_totals(self, project_id):
+        """
+        Sum the expenses of a project per category.
+        """
+        try:
+            cursor = self.conn.execute(
+                """
+                SELECT category, SUM(amount) AS total
+                FROM expenses
+                WHERE project_id = ?
+                GROUP BY category
+                ORDER BY MIN(id)
+                """,
+                (project_id,)
+            )
+            return {row["category"]: row["total"] for row in cursor.fetchall()}
+        except sqlite3.Error as e:
+            logging.error(f"Error fetching category totals: {e}")
+            return {}
+
+    def get_monthly_totals(self, project_id):
+        """
+        Sum the expenses of a project per month, oldest month first.
+        Returns a dictionary mapping "YYYY-MM" to the total spent that month.
+        """
+        try:
+            cursor = self.conn.execute(
+                """
+                SELECT substr(date, 1, 7) AS month, SUM(amount) AS total
+                FROM expenses
+                WHERE project_id = ?
+                GROUP BY month
+                ORDER BY month
+                """,
+                (project_id,)
+            )
+            return {row["month"]: row["total"] for row in cursor.fetchall()}
+        except sqlite3.Error as e:
+            logging.error(f"Error fetching monthly totals: {e}")
+            return {}
+
+    def get_project_expense_totals(self, category=None):
+        """
+        Sum the expenses of every project, optionally for one category only.
+        Returns a dictionary mapping project IDs to their "total" and "last_date".
+        """
+        try:
+            query = "SELECT project_id, SUM(amount) AS total, MAX(date) AS last_date FROM expenses"
+            params = ()
+            if category is not None:
+                query += " WHERE category = ?"
+                params = (category,)
+            cursor = self.conn.execute(query + " GROUP BY project_id", params)
+            return {
+                row["project_id"]: {"total": row["total"], "last_date": row["last_date"]}
+                for row in cursor.fetchall()
+            }
+        except sqlite3.Error as e:
+            logging.error(f"Error fetching project expense totals: {e}")
+            return {}
+
+    def save_calibration_profile(self, name, a, b, c, d, project_count, effort_error=None, schedule_error=None):
+        """
+        Store a new version of a calibration profile and return its version number.
+        """
+        try:
+            cursor = self.conn.execute(
+                "SELECT COALESCE(MAX(version), 0) + 1 AS version FROM calibration_profiles WHERE name = ?",
+                (name,)
+            )
+            version = cursor.fetchone()["version"]
+            self.conn.execute(
+                """
+                INSERT INTO calibration_profiles
+                    (name, version, a, b, c, d, project_count, effort_error, schedule_error, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
+                """,
+                (name, version, a, b, c, d, project_count, effort_error, schedule_error),
+            )
+            self.conn.commit()
+            logging.info(f"Calibration profile '{name}' version {version} saved.")
+            return version
+        except sqlite3.Error as e:
+            logging.error(f"Error saving calibration profile: {e}")
+            raise
+
+    def get_calibration_profile(self, name, version=None):
+        """
+        Fetch a calibration profile by name; the latest version unless one is given.
+        """
+        try:
+            if version is None:
+                cursor = self.conn.execute(
+                    "SELECT * FROM calibration_profiles WHERE name = ? ORDER BY version DESC LIMIT 1",
+                    (name,)
+                )
+            else:
+                cursor = self.conn.execute(
+                    "SELECT * FROM calibration_profiles WHERE name = ? AND version = ?",
+                    (name, version)
+                )
+            row = cursor.fetchone()
+            return dict(row) if row else None
+        except sqlite3.Error as e:
+            logging.error(f"Error fetching calibration profile: {e}")
+            return None
+
+    def get_calibration_profile_names(self):
+        """
+        Fetch the names of all calibration profiles.
+        """
+        try:
+            cursor = self.conn.execute("SELECT DISTINCT name FROM calibration_profiles ORDER BY name")
+            return [row["name"] for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            logging.error(f"Error fetching calibration profile names: {e}")
+            return []
+
+    def _search_index_exists(self):
+        """
+        Tell whether the expenses_fts table exists; cached per connection.
+        """
+        if self._has_search_index is None:
+            try:
+                self._has_search_index = self.conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'expenses_fts'"
+                ).fetchone() is not None
+            except sqlite3.Error as e:
+                logging.error(f"Error checking the search index: {e}")
+                return False
+        return self._has_search_index
+
+    def search_expenses(self, text=None, project_id=None, category=None, min_amount=None,
+                        max_amount=None, start_date=None, end_date=None, limit=50, offset=0):
+        """
+        Search expenses across all projects.
+        - text: words to find in the description; each word also matches as a prefix.
+        - project_id, category: exact filters.
+        - min_amount, max_amount, start_date, end_date: inclusive ranges.
+        - limit, offset: pagination.
+        Text matches are ordered by relevance, other searches by date, newest first.
+        Without FTS5 the words match anywhere in the description and results
+        are ordered by date.
+        Each result carries the project name. Archived expenses are not searched.
+        """
+        conditions = []
+        params = []
+        for condition, value in [
+            ("e.project_id = ?", project_id),
+            ("e.category = ?", category),
+            ("e.amount >= ?", min_amount),
+            ("e.amount <= ?", max_amount),
+            ("e.date >= ?", start_date),
+            ("e.date <= ?", end_date),
+        ]:
+            if value is not None and value != "":
+                conditions.append(condition)
+                params.append(value)
+
+        words = re.findall(r"\w+", text or "")
+        if words and not self._search_index_exists():
+            # Without FTS5 each word must appear somewhere in the description
+            for word in words:
+                conditions.append("e.description LIKE ? ESCAPE '\\'")
+                params.append("%" + word.replace("_", "\\_") + "%")
+            words = []
+
+        if words:
+            # Quote every word so user input can never be parsed as FTS5 syntax
+            match = " ".join(f'"{word}"*' for word in words)
+            # CROSS JOIN keeps the full-text match as the outer loop; otherwise
+            # SQLite may scan a filter index and re-run the match for every row.
+            query = """
+                SELECT e.*, p.name AS project_name
+                FROM expenses_fts
+                CROSS JOIN expenses e ON e.id = expenses_fts.rowid
+                JOIN projects p ON p.id = e.project_id
+                WHERE expenses_fts MATCH ?
+            """
+            params.insert(0, match)
+            conditions_sql = "".join(f" AND {condition}" for condition in conditions)
+            order = " ORDER BY bm25(expenses_fts), e.date DESC"
+        else:
+            query = """
+                SELECT e.*, p.name AS project_name
+                FROM expenses e
+                JOIN projects p ON p.id = e.project_id
+            """
+            conditions_sql = " WHERE " + " AND ".join(conditions) if conditions else ""
+            order = " ORDER BY e.date DESC, e.id DESC"
+
+        try:
+            cursor = self.conn.execute(
+                query + conditions_sql + order + " LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            )
+            return [dict(row) for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            logging.error(f"Error searching expenses: {e}")
+            return []
+
     def get_categories(self):
         """
         Fetch all categories from the database.
@@ -207,8 +777,10 @@ class Database:
         Close the database connection.
         """
         try:
-            if self.conn:
-                self.conn.close()
+            if self._conn:
+                self._conn.close()
+                self._conn = None
+                self._has_search_index = None
                 logging.info("Database connection closed.")
         except sqlite3.Error as e:
             logging.error(f"Error closing database connection: {e}")
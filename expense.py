@@ -1,14 +1,13 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from matplotlib import pyplot as plt
-from database import Database
-from datetime import datetime, timedelta
+from database import get_database
+from datetime import datetime
 import logging
-import numpy as np
-from sklearn.linear_model import LinearRegression
-from fpdf import FPDF
+from utils import deliver_changes
+from reports import forecast_expenses, build_recommendations, write_expense_report
 
-db = Database("static/data/projects.db")
+db = get_database()
 
 
 def setup_expense_tab(expense_frame):
@@ -20,6 +19,12 @@ def setup_expense_tab(expense_frame):
     - Category management
     """
 
+    SEARCH_PAGE_SIZE = 20
+    search_state = {"page": 0}
+
+    # Project currently shown in the history, so change events can be applied as deltas.
+    shown = {"project_id": None, "version": None, "expense_ids": set(), "remaining": 0.0}
+
     def update_expense_project_list():
         try:
             project_list = db.get_projects()
@@ -60,14 +65,21 @@ def setup_expense_tab(expense_frame):
             db.add_expense(project_id, description, amount, category, date)
 
             messagebox.showinfo("Success", "Expense added successfully!")
-            update_expense_history()
-            update_remaining_budget()
+            # The change event appends the expense when the project is already shown.
+            if shown["project_id"] != project_id:
+                refresh_project_view()
         except ValueError:
             messagebox.showerror("Input Error", "Please enter a valid expense amount.")
         except Exception as e:
             logging.error(f"Error adding expense: {e}")
             messagebox.showerror("Error", "An error occurred while adding the expense.")
 
+    def insert_expense_row(expense):
+        expense_history_list.insert(
+            tk.END, f"{expense['description']} - ${expense['amount']} ({expense['category']}) on {expense['date']}"
+        )
+        shown["expense_ids"].add(expense["id"])
+
     def update_expense_history():
         selected_project = project_combo.get()
         if not selected_project:
@@ -78,10 +90,10 @@ def setup_expense_tab(expense_frame):
             expenses = db.get_expenses(project_id)
 
             expense_history_list.delete(0, tk.END)
+            shown["project_id"] = project_id
+            shown["expense_ids"] = set()
             for expense in expenses:
-                expense_history_list.insert(
-                    tk.END, f"{expense['description']} - ${expense['amount']} ({expense['category']}) on {expense['date']}"
-                )
+                insert_expense_row(expense)
         except Exception as e:
             logging.error(f"Error updating expense history: {e}")
 
@@ -91,11 +103,46 @@ def setup_expense_tab(expense_frame):
             if not selected_project:
                 return
 
-            remaining_budget = db.get_remaining_budget(selected_project)
-            remaining_budget_label.config(text=f"Remaining Budget: $ {remaining_budget:.2f}")
+            shown["remaining"] = db.get_remaining_budget(selected_project)
+            remaining_budget_label.config(text=f"Remaining Budget: $ {shown['remaining']:.2f}")
         except Exception as e:
             logging.error(f"Error updating remaining budget: {e}")
 
+    def refresh_project_view(event=None):
+        """
+        Reload the history and remaining budget of the selected project,
+        unless it is already shown and has not changed since.
+        """
+        selected_project = project_combo.get()
+        if not selected_project:
+            return
+
+        project_id = db.get_project_id(selected_project)
+        version = db.get_project_version(project_id)
+        if shown["project_id"] == project_id and shown["version"] == version:
+            return
+
+        update_expense_history()
+        update_remaining_budget()
+        shown["version"] = version
+
+    def apply_change(event):
+        """
+        Apply a database change event to the shown project without reloading it.
+        """
+        if event["project_id"] != shown["project_id"]:
+            return
+
+        if event["type"] == "expenses_added":
+            new_expenses = [expense for expense in event["expenses"] if expense["id"] not in shown["expense_ids"]]
+            for expense in new_expenses:
+                insert_expense_row(expense)
+            shown["remaining"] -= sum(expense["amount"] for expense in new_expenses)
+            remaining_budget_label.config(text=f"Remaining Budget: $ {shown['remaining']:.2f}")
+        elif event["type"] == "project_changed":
+            shown["version"] = None
+            refresh_project_view()
+
     def show_expense_pie_chart():
         try:
             selected_project = project_combo.get()
@@ -104,15 +151,8 @@ def setup_expense_tab(expense_frame):
                 return
 
             project_id = db.get_project_id(selected_project)
-            total_budget = db.get_projects()[0]["cost"]
             remaining_budget = db.get_remaining_budget(selected_project)
-
-            expenses = db.get_expenses(project_id)
-            category_totals = {}
-            for expense in expenses:
-                category = expense["category"]
-                amount = expense["amount"]
-                category_totals[category] = category_totals.get(category, 0) + amount
+            category_totals = db.get_category_totals(project_id)
 
             labels = list(category_totals.keys()) + ["Remaining"]
             values = list(category_totals.values()) + [remaining_budget]
@@ -137,19 +177,13 @@ def setup_expense_tab(expense_frame):
                 return
 
             project_id = db.get_project_id(selected_project)
-            expenses = db.get_expenses(project_id)
+            monthly_totals = db.get_monthly_totals(project_id)
 
-            if not expenses:
+            if not monthly_totals:
                 messagebox.showerror("Data Error", "No expenses recorded for this project.")
                 return
 
-            monthly_totals = {}
-            for expense in expenses:
-                expense_date = datetime.strptime(expense["date"], "%Y-%m-%d")
-                month_year = expense_date.strftime("%B %Y")
-                monthly_totals[month_year] = monthly_totals.get(month_year, 0) + expense["amount"]
-
-            months = list(monthly_totals.keys())
+            months = [datetime.strptime(month, "%Y-%m").strftime("%B %Y") for month in monthly_totals]
             spending = list(monthly_totals.values())
 
             plt.figure(figsize=(8, 5))
@@ -181,62 +215,22 @@ def setup_expense_tab(expense_frame):
                 messagebox.showerror("Data Error", "No expenses recorded for this project.")
                 return
 
-            # Prepare data for Linear Regression
-            dates = []
-            amounts = []
-            for expense in expenses:
-                if expense["date"]:
-                    date_obj = datetime.strptime(expense["date"], "%Y-%m-%d")
-                    dates.append(date_obj.toordinal())  # Convert date to ordinal for regression
-                    amounts.append(expense["amount"])
-
-            if len(dates) < 2:
+            forecast = forecast_expenses(expenses)
+            if forecast is None:
                 messagebox.showerror("Data Error", "Not enough data points for prediction.")
                 return
 
-            X = np.array(dates).reshape(-1, 1)
-            y = np.array(amounts)
-
-            # Train Linear Regression model
-            model = LinearRegression()
-            model.fit(X, y)
-
-            # Predict future expenses
-            future_dates = [(datetime.now() + timedelta(days=i * 30)).toordinal() for i in range(1, 7)]
-            future_expenses = model.predict(np.array(future_dates).reshape(-1, 1))
-
             # Fetch total budget and remaining budget
-            total_budget = db.get_projects()[0]["cost"]
+            total_budget = db.get_project_details(project_id)["cost"]
             remaining_budget = db.get_remaining_budget(selected_project)
 
-            # Generate category-based recommendations
-            category_totals = {}
-            for expense in expenses:
-                category = expense["category"]
-                amount = expense["amount"]
-                category_totals[category] = category_totals.get(category, 0) + amount
-
-            # Calculate category allocation suggestions
-            total_spent = sum(category_totals.values())
-            suggestions = []
-            for category, spent in category_totals.items():
-                recommended = (spent / total_spent) * remaining_budget
-                suggestions.append(f"Allocate ${recommended:.2f} to {category}.")
-
-            # Cost efficiency suggestions based on project parameters
-            recommendations = []
-            if total_budget > 1000000:  # Example threshold
-                recommendations.append("Consider reducing hourly rates or optimizing resource allocation.")
-            if category_totals.get("Tools", 0) > (0.3 * total_budget):
-                recommendations.append("Re-evaluate tool costs; consider cheaper alternatives.")
-            if remaining_budget < 0:
-                recommendations.append("Adjust budget or cut unnecessary expenditures to avoid a deficit.")
-            if future_expenses[-1] > remaining_budget:
-                recommendations.append("Plan for potential budget overrun in future months.")
+            suggestions, recommendations = build_recommendations(
+                total_budget, remaining_budget, db.get_category_totals(project_id), forecast
+            )
 
             # Generate output
             prediction_text = "\n".join(
-                [f"Month {i+1}: ${future_expenses[i]:.2f}" for i in range(len(future_expenses))]
+                [f"Month {i+1}: ${amount:.2f}" for i, (_, amount) in enumerate(forecast)]
             )
             category_suggestions_text = "\n".join(suggestions)
             cost_efficiency_text = "\n".join(recommendations) if recommendations else "Your budget is sufficient."
@@ -266,50 +260,66 @@ def setup_expense_tab(expense_frame):
             expenses = db.get_expenses(project_id)
             remaining_budget = db.get_remaining_budget(selected_project)
 
-            # Initialize PDF
-            pdf = FPDF()
-            pdf.set_auto_page_break(auto=True, margin=15)
-            pdf.add_page()
-            pdf.set_font("Arial", size=12)
-
-            # Title
-            pdf.set_font("Arial", style="B", size=16)
-            pdf.cell(200, 10, txt=f"Expense Report for Project: {selected_project}", ln=True, align="C")
-            pdf.ln(10)
-
-            # Project Details
-            pdf.set_font("Arial", style="B", size=12)
-            pdf.cell(200, 10, txt="Project Details:", ln=True, align="L")
-            pdf.set_font("Arial", size=12)
-            pdf.cell(200, 10, txt=f"Name: {project_details['name']}", ln=True, align="L")
-            pdf.cell(200, 10, txt=f"Start Date: {project_details['start_date']}", ln=True, align="L")
-            pdf.cell(200, 10, txt=f"Total Budget: ${project_details['cost']:.2f}", ln=True, align="L")
-            pdf.cell(200, 10, txt=f"Remaining Budget: ${remaining_budget:.2f}", ln=True, align="L")
-            pdf.ln(10)
-
-            # Expense History
-            pdf.set_font("Arial", style="B", size=12)
-            pdf.cell(200, 10, txt="Expense History:", ln=True, align="L")
-            pdf.set_font("Arial", size=12)
-            if expenses:
-                for expense in expenses:
-                    pdf.cell(200, 10, txt=f"{expense['description']} - ${expense['amount']} ({expense['category']}) on {expense['date']}", ln=True, align="L")
-            else:
-                pdf.cell(200, 10, txt="No expenses recorded.", ln=True, align="L")
-            pdf.ln(10)
-
-            # Save PDF
             report_path = f"{selected_project}_Expense_Report.pdf"
-            pdf.output(report_path)
+            write_expense_report(report_path, project_details, expenses, remaining_budget)
             messagebox.showinfo("Success", f"Report generated successfully: {report_path}")
         except Exception as e:
             logging.error(f"Error generating report: {e}")
             messagebox.showerror("Error", "Could not generate report.")
 
+    def update_search_category_list():
+        try:
+            search_category_combo['values'] = [""] + db.get_categories()
+        except Exception as e:
+            logging.error(f"Error updating category list: {e}")
+
+    def search_expenses(page=0):
+        """
+        Search expenses of all projects and show one page of the results.
+        """
+        try:
+            min_amount = float(search_min_entry.get()) if search_min_entry.get() else None
+            max_amount = float(search_max_entry.get()) if search_max_entry.get() else None
+            start_date = search_start_entry.get()
+            end_date = search_end_entry.get()
+            for date in (start_date, end_date):
+                if date:
+                    datetime.strptime(date, "%Y-%m-%d")
+
+            results = db.search_expenses(
+                search_entry.get(),
+                category=search_category_combo.get() or None,
+                min_amount=min_amount,
+                max_amount=max_amount,
+                start_date=start_date or None,
+                end_date=end_date or None,
+                limit=SEARCH_PAGE_SIZE,
+                offset=page * SEARCH_PAGE_SIZE
+            )
+            if page > 0 and not results:
+                messagebox.showinfo("Search", "No more results.")
+                return
+
+            search_state["page"] = page
+            search_results_list.delete(0, tk.END)
+            for expense in results:
+                search_results_list.insert(
+                    tk.END,
+                    f"[{expense['project_name']}] {expense['description']} - ${expense['amount']} "
+                    f"({expense['category']}) on {expense['date']}"
+                )
+            search_page_label.config(text=f"Page {page + 1}")
+        except ValueError:
+            messagebox.showerror("Input Error", "Please enter valid amounts and dates (YYYY-MM-DD).")
+        except Exception as e:
+            logging.error(f"Error searching expenses: {e}")
+            messagebox.showerror("Error", "Could not search expenses.")
+
     # Widgets for Expense Tab
     tk.Label(expense_frame, text="Select Project:").grid(row=0, column=0, padx=10, pady=5)
     project_combo = ttk.Combobox(expense_frame, postcommand=update_expense_project_list)
     project_combo.grid(row=0, column=1, padx=10, pady=5)
+    project_combo.bind("<<ComboboxSelected>>", refresh_project_view)
 
     tk.Label(expense_frame, text="Expense Description:").grid(row=1, column=0, padx=10, pady=5)
     expense_description_entry = tk.Entry(expense_frame)
@@ -349,3 +359,45 @@ def setup_expense_tab(expense_frame):
 
     generate_report_button = tk.Button(expense_frame, text="Generate Expense Report", command=generate_expense_report)
     generate_report_button.grid(row=12, column=0, columnspan=2, pady=10)
+
+    tk.Label(expense_frame, text="Search Expenses:").grid(row=13, column=0, padx=10, pady=5)
+    search_entry = tk.Entry(expense_frame)
+    search_entry.grid(row=13, column=1, padx=10, pady=5)
+    search_entry.bind("<Return>", lambda event: search_expenses())
+
+    tk.Label(expense_frame, text="Amount Range ($):").grid(row=14, column=0, padx=10, pady=5)
+    amount_range_frame = tk.Frame(expense_frame)
+    amount_range_frame.grid(row=14, column=1, padx=10, pady=5)
+    search_min_entry = tk.Entry(amount_range_frame, width=9)
+    search_min_entry.pack(side=tk.LEFT)
+    tk.Label(amount_range_frame, text="to").pack(side=tk.LEFT, padx=5)
+    search_max_entry = tk.Entry(amount_range_frame, width=9)
+    search_max_entry.pack(side=tk.LEFT)
+
+    tk.Label(expense_frame, text="Date Range (YYYY-MM-DD):").grid(row=15, column=0, padx=10, pady=5)
+    date_range_frame = tk.Frame(expense_frame)
+    date_range_frame.grid(row=15, column=1, padx=10, pady=5)
+    search_start_entry = tk.Entry(date_range_frame, width=11)
+    search_start_entry.pack(side=tk.LEFT)
+    tk.Label(date_range_frame, text="to").pack(side=tk.LEFT, padx=5)
+    search_end_entry = tk.Entry(date_range_frame, width=11)
+    search_end_entry.pack(side=tk.LEFT)
+
+    tk.Label(expense_frame, text="Search Category:").grid(row=16, column=0, padx=10, pady=5)
+    search_category_combo = ttk.Combobox(expense_frame, postcommand=update_search_category_list)
+    search_category_combo.grid(row=16, column=1, padx=10, pady=5)
+
+    search_button = tk.Button(expense_frame, text="Search", command=search_expenses)
+    search_button.grid(row=17, column=0, columnspan=2, pady=10)
+
+    search_results_list = tk.Listbox(expense_frame, height=10, width=70)
+    search_results_list.grid(row=18, column=0, columnspan=2, padx=10, pady=5)
+
+    search_page_frame = tk.Frame(expense_frame)
+    search_page_frame.grid(row=19, column=0, columnspan=2, pady=5)
+    tk.Button(search_page_frame, text="< Previous", command=lambda: search_expenses(max(search_state["page"] - 1, 0))).pack(side=tk.LEFT)
+    search_page_label = tk.Label(search_page_frame, text="Page 1")
+    search_page_label.pack(side=tk.LEFT, padx=10)
+    tk.Button(search_page_frame, text="Next >", command=lambda: search_expenses(search_state["page"] + 1)).pack(side=tk.LEFT)
+
+    deliver_changes(expense_frame, db, apply_change)
@@ -0,0 +1,194 @@
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+
+from database import Database
+
+_STOP = object()
+
+
+class ExpenseWriter:
+    """
+    Single-writer ingestion queue for expenses with group commit.
+
+    Any number of threads submit expenses; one background thread owns the
+    database connection and writes them in batches, one transaction (and one
+    fsync) per batch instead of one per expense. A batch is flushed when it
+    reaches batch_size expenses or when max_delay seconds have passed since
+    its first expense arrived.
+
+    Every submission returns a Future that resolves to the new expense id once
+    the batch containing it has been committed, so a resolved Future is a
+    durable acknowledgement. The queue holds at most max_pending expenses;
+    submit blocks while it is full, which pushes back on producers that are
+    faster than the disk.
+
+    If the writer thread fails, every pending Future fails with the error and
+    further submissions raise RuntimeError. Submissions made once stop has
+    been called raise RuntimeError as well.
+    """
+
+    def __init__(self, db_path, batch_size=1000, max_delay=0.005, max_pending=10000):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = None
+        self._error = None
+        # Guards _closing, so that no expense is queued behind _STOP.
+        self._lock = threading.Lock()
+        self._closing = False
+
+    def start(self):
+        """
+        Start the writer thread.
+        """
+        with self._lock:
+            if self._thread is None:
+                self._closing = False
+                self._thread = threading.Thread(target=self._run, name="ExpenseWriter", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Flush every queued expense and stop the writer thread.
+        """
+        with self._lock:
+            thread = self._thread
+            if thread is None or self._closing:
+                return
+            self._closing = True
+            if thread.is_alive():
+                self._queue.put(_STOP)
+        thread.join()
+        self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def submit(self, project_id, description, amount, category, date, timeout=None):
+        """
+        Queue an expense and return a Future for its id.
+
+        Blocks while the queue is full; raises queue.Full if timeout expires first.
+        """
+        if self._error is not None:
+            raise RuntimeError(f"ExpenseWriter failed: {self._error}") from self._error
+        future = Future()
+        with self._lock:
+            if self._closing or self._thread is None or not self._thread.is_alive():
+                raise RuntimeError("ExpenseWriter is not running.")
+            self._queue.put(((project_id, description, amount, category, date), future), timeout=timeout)
+        # The writer records its error before draining the queue, so an
+        # expense queued after the drain is failed here instead.
+        if self._error is not None:
+            _fail(future, self._error)
+        return future
+
+    def add_expense(self, project_id, description, amount, category, date, timeout=None):
+        """
+        Queue an expense and wait until it has been committed. Returns its id.
+        """
+        return self.submit(project_id, description, amount, category, date, timeout).result(timeout)
+
+    def _next_batch(self):
+        """
+        Collect the next batch from the queue.
+
+        Returns (batch, stop) where stop tells the writer to exit once the
+        batch has been written.
+        """
+        item = self._queue.get()
+        if item is _STOP:
+            return [], True
+
+        batch = [item]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _write_batch(self, db, batch):
+        """
+        Commit a batch and resolve its futures.
+
+        If a constraint fails, the expenses are retried one by one so that a
+        single bad expense only fails its own Future. Any other database error
+        (a locked or full disk) fails the whole batch.
+        """
+        try:
+            expense_ids = db.add_expenses([expense for expense, _ in batch])
+        except sqlite3.IntegrityError:
+            for expense, future in batch:
+                try:
+                    future.set_result(db.add_expenses([expense])[0])
+                except sqlite3.Error as e:
+                    future.set_exception(e)
+            return
+        except sqlite3.Error as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        for (_, future), expense_id in zip(batch, expense_ids):
+            future.set_result(expense_id)
+
+    def _drain(self, error):
+        """
+        Fail every expense left in the queue.
+        """
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not _STOP:
+                _fail(item[1], error)
+
+    def _run(self):
+        db = None
+        batch = []
+        try:
+            db = Database(self.db_path)
+            if db.conn is None:
+                raise sqlite3.OperationalError(f"Cannot open database: {self.db_path}")
+            stop = False
+            while not stop:
+                batch, stop = self._next_batch()
+                if batch:
+                    self._write_batch(db, batch)
+                batch = []
+            self._drain(RuntimeError("ExpenseWriter stopped."))
+        except Exception as e:
+            logging.error(f"Expense writer stopped unexpectedly: {e}")
+            self._error = e
+            for _, future in batch:
+                _fail(future, e)
+            self._drain(e)
+        finally:
+            if db is not None:
+                db.close()
+
+
+def _fail(future, error):
+    """
+    Fail a Future unless it has already been resolved.
+    """
+    try:
+        future.set_exception(error)
+    except InvalidStateError:
+        pass
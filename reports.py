@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta
+import numpy as np
+from sklearn.linear_model import LinearRegression
+from fpdf import FPDF
+
+
+def forecast_expenses(expenses, months=6, today=None):
+    """
+    Predict the spending of the coming months with a linear regression over
+    the recorded expenses.
+
+    Returns a list of (date, predicted amount) pairs, one per month, or None
+    when there are fewer than two dated expenses to fit.
+    """
+    dates = []
+    amounts = []
+    for expense in expenses:
+        if expense["date"]:
+            date_obj = datetime.strptime(expense["date"], "%Y-%m-%d")
+            dates.append(date_obj.toordinal())  # Convert date to ordinal for regression
+            amounts.append(expense["amount"])
+
+    if len(dates) < 2:
+        return None
+
+    X = np.array(dates).reshape(-1, 1)
+    y = np.array(amounts)
+
+    model = LinearRegression()
+    model.fit(X, y)
+
+    today = today or datetime.now()
+    future_dates = [today + timedelta(days=i * 30) for i in range(1, months + 1)]
+    future_expenses = model.predict(np.array([d.toordinal() for d in future_dates]).reshape(-1, 1))
+    return list(zip(future_dates, (float(amount) for amount in future_expenses)))
+
+
+def build_recommendations(total_budget, remaining_budget, category_totals, forecast):
+    """
+    Build category allocation suggestions and cost efficiency recommendations.
+
+    Returns a (suggestions, recommendations) pair of lists of strings.
+    """
+    total_spent = sum(category_totals.values())
+    suggestions = []
+    for category, spent in category_totals.items():
+        recommended = (spent / total_spent) * remaining_budget if total_spent else 0.0
+        suggestions.append(f"Allocate ${recommended:.2f} to {category}.")
+
+    recommendations = []
+    if total_budget > 1000000:  # Example threshold
+        recommendations.append("Consider reducing hourly rates or optimizing resource allocation.")
+    if category_totals.get("Tools", 0) > (0.3 * total_budget):
+        recommendations.append("Re-evaluate tool costs; consider cheaper alternatives.")
+    if remaining_budget < 0:
+        recommendations.append("Adjust budget or cut unnecessary expenditures to avoid a deficit.")
+    if forecast and forecast[-1][1] > remaining_budget:
+        recommendations.append("Plan for potential budget overrun in future months.")
+
+    return suggestions, recommendations
+
+
+def write_expense_report(report_path, project_details, expenses, remaining_budget):
+    """
+    Write the PDF expense report of a project to report_path.
+    """
+    pdf = FPDF()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.add_page()
+    pdf.set_font("Arial", size=12)
+
+    # Title
+    pdf.set_font("Arial", style="B", size=16)
+    pdf.cell(200, 10, txt=f"Expense Report for Project: {project_details['name']}", ln=True, align="C")
+    pdf.ln(10)
+
+    # Project Details
+    pdf.set_font("Arial", style="B", size=12)
+    pdf.cell(200, 10, txt="Project Details:", ln=True, align="L")
+    pdf.set_font("Arial", size=12)
+    pdf.cell(200, 10, txt=f"Name: {project_details['name']}", ln=True, align="L")
+    pdf.cell(200, 10, txt=f"Start Date: {project_details['start_date']}", ln=True, align="L")
+    pdf.cell(200, 10, txt=f"Total Budget: ${project_details['cost']:.2f}", ln=True, align="L")
+    pdf.cell(200, 10, txt=f"Remaining Budget: ${remaining_budget:.2f}", ln=True, align="L")
+    pdf.ln(10)
+
+    # Expense History
+    pdf.set_font("Arial", style="B", size=12)
+    pdf.cell(200, 10, txt="Expense History:", ln=True, align="L")
+    pdf.set_font("Arial", size=12)
+    if expenses:
+        for expense in expenses:
+            pdf.cell(200, 10, txt=f"{expense['description']} - ${expense['amount']} ({expense['category']}) on {expense['date']}", ln=True, align="L")
+    else:
+        pdf.cell(200, 10, txt="No expenses recorded.", ln=True, align="L")
+    pdf.ln(10)
+
+    pdf.output(report_path)
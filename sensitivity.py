@@ -0,0 +1,162 @@
+import numpy as np
+from cocomo_calculator import COCOMOCalculator, HOURS_PER_MONTH
+
+
+class SensitivityAnalyzer:
+    """
+    What-if analysis of the COCOMO driver ratings for a single project.
+
+    Every driver gets its own axis of a NumPy grid, so the whole set of rating
+    combinations is evaluated in one broadcast call to
+    COCOMOCalculator.calculate_effort instead of nested Python loops.
+    """
+
+    def __init__(self, calculator=None):
+        self.calculator = calculator or COCOMOCalculator()
+
+    def drivers(self):
+        """
+        List every driver name, scale factors first.
+        """
+        return self.calculator.scale_factor_drivers + self.calculator.effort_multiplier_drivers
+
+    def _table(self, driver):
+        if driver in self.calculator.scale_factor_drivers:
+            return self.calculator.scale_factors
+        return self.calculator.effort_multipliers
+
+    def sweep(self, sloc, reused, modified, hourly_rate, ratings=None):
+        """
+        Evaluate effort, schedule and cost for every combination of ratings.
+
+        - ratings: optional dictionary mapping a driver to the list of ratings
+          to sweep. Drivers left out are swept over every rating in their
+          table; pass a single-item list to pin a driver.
+
+        Returns a dictionary with the swept "drivers", the "ratings" of each
+        driver, and "effort", "schedule" and "cost" arrays with one axis per
+        driver, in the order of "drivers".
+
+        Raises ValueError for an unknown driver or an empty list of ratings.
+        """
+        ratings = ratings or {}
+        drivers = self.drivers()
+        unknown = sorted(set(ratings) - set(drivers))
+        if unknown:
+            raise ValueError(f"Unknown COCOMO drivers: {', '.join(unknown)}")
+        swept = {driver: list(ratings.get(driver, self._table(driver).keys())) for driver in drivers}
+        empty = [driver for driver in drivers if not swept[driver]]
+        if empty:
+            raise ValueError(f"No ratings to sweep for: {', '.join(empty)}")
+
+        scale_factors = {}
+        effort_multipliers = {}
+        for axis, driver in enumerate(drivers):
+            shape = [1] * len(drivers)
+            shape[axis] = len(swept[driver])
+            values = np.array([self._table(driver)[rating] for rating in swept[driver]]).reshape(shape)
+            if driver in self.calculator.scale_factor_drivers:
+                scale_factors[driver] = values
+            else:
+                effort_multipliers[driver] = values
+
+        effort = self.calculator.calculate_effort(sloc, reused, modified, scale_factors, effort_multipliers)
+        effort = np.broadcast_to(effort, [len(swept[driver]) for driver in drivers])
+        schedule = self.calculator.calculate_schedule(effort)
+        return {
+            "drivers": drivers,
+            "ratings": swept,
+            "effort": effort,
+            "schedule": schedule,
+            "cost": effort * hourly_rate * HOURS_PER_MONTH,
+        }
+
+    def sweep_project(self, project, ratings=None):
+        """
+        Sweep a project row as returned by Database.get_project_details.
+        """
+        return self.sweep(project["sloc"], project["reused"], project["modified"], project["hourly_rate"], ratings)
+
+    def ranked(self, result, count=10, largest=False):
+        """
+        Return the cheapest (or most expensive) combinations of a sweep as dictionaries.
+        """
+        cost = result["cost"].ravel()
+        count = min(count, cost.size)
+        order = -cost if largest else cost
+        indices = np.argpartition(order, count - 1)[:count]
+        indices = indices[np.argsort(order[indices])]
+
+        rows = []
+        for flat_index in indices:
+            position = np.unravel_index(flat_index, result["cost"].shape)
+            row = {
+                driver: result["ratings"][driver][index]
+                for driver, index in zip(result["drivers"], position)
+            }
+            row.update({
+                "effort": float(result["effort"][position]),
+                "schedule": float(result["schedule"][position]),
+                "cost": float(result["cost"][position]),
+            })
+            rows.append(row)
+        return rows
+
+    def tornado(self, sloc, reused, modified, hourly_rate, baseline=None):
+        """
+        Measure how far each driver alone moves the cost away from the baseline.
+
+        - baseline: dictionary of driver ratings to hold fixed; drivers left
+          out are held at "Nominal".
+
+        Returns (baseline_cost, rows) where rows are sorted by swing, largest
+        first, and give each driver's lowest and highest cost and ratings.
+        """
+        baseline = {driver: (baseline or {}).get(driver, "Nominal") for driver in self.drivers()}
+        pinned = {driver: [rating] for driver, rating in baseline.items()}
+        baseline_cost = float(self.sweep(sloc, reused, modified, hourly_rate, pinned)["cost"].ravel()[0])
+
+        rows = []
+        for driver in self.drivers():
+            ratings = dict(pinned)
+            del ratings[driver]
+            result = self.sweep(sloc, reused, modified, hourly_rate, {**ratings, driver: list(self._table(driver))})
+            cost = result["cost"].ravel()
+            low, high = int(np.argmin(cost)), int(np.argmax(cost))
+            rows.append({
+                "driver": driver,
+                "low_rating": result["ratings"][driver][low],
+                "low_cost": float(cost[low]),
+                "high_rating": result["ratings"][driver][high],
+                "high_cost": float(cost[high]),
+                "swing": float(cost[high] - cost[low]),
+            })
+        rows.sort(key=lambda row: row["swing"], reverse=True)
+        return baseline_cost, rows
+
+
+def plot_tornado(baseline_cost, rows, title="Cost Sensitivity", output_path=None):
+    """
+    Draw a tornado chart of SensitivityAnalyzer.tornado output.
+    Saves it to output_path when given, otherwise shows it.
+    """
+    from matplotlib import pyplot as plt
+
+    rows = list(reversed(rows))  # Largest swing on top
+    labels = [row["driver"] for row in rows]
+    positions = range(len(rows))
+
+    plt.figure(figsize=(8, 5))
+    plt.barh(positions, [row["low_cost"] - baseline_cost for row in rows], left=baseline_cost, color="#66b3ff", label="Lowest rating")
+    plt.barh(positions, [row["high_cost"] - baseline_cost for row in rows], left=baseline_cost, color="#ff9999", label="Highest rating")
+    plt.axvline(baseline_cost, color="black", linewidth=1)
+    plt.yticks(positions, labels)
+    plt.xlabel("Total Cost ($)")
+    plt.title(title)
+    plt.legend()
+    plt.tight_layout()
+    if output_path:
+        plt.savefig(output_path)
+        plt.close()
+    else:
+        plt.show()
@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Database
+
+
+@pytest.fixture
+def db():
+    """
+    A fresh in-memory database.
+    """
+    database = Database(":memory:")
+    yield database
+    database.close()
@@ -0,0 +1,114 @@
+"""
+Random data generators and straightforward reference implementations.
+
+The optimized code paths (SQL aggregates, vectorized sweeps, batching) are
+checked against these plain loops over the generated data.
+"""
+import random
+from datetime import date, timedelta
+
+CATEGORIES = ["Development", "Tools", "Travel", "Miscellaneous"]
+WORDS = ["laptop", "license", "flight", "hotel", "server", "cloud", "monitor", "training", "consulting", "taxi"]
+RATINGS = ["Nominal", "Very Low", "Low", "High", "Very High", "Extra High"]
+
+
+def random_date(rng, start=date(2018, 1, 1), days=365 * 6):
+    return (start + timedelta(days=rng.randrange(days))).isoformat()
+
+
+def random_expense(rng, project_id):
+    return (
+        project_id,
+        " ".join(rng.sample(WORDS, rng.randint(1, 3))),
+        round(rng.uniform(0.01, 5000), 2),
+        rng.choice(CATEGORIES),
+        random_date(rng),
+    )
+
+
+def populate(db, seed, project_count=20, expense_count=500):
+    """
+    Fill db with random projects and a random expense stream.
+    Returns (projects, expenses) as lists of dictionaries.
+    """
+    rng = random.Random(seed)
+    projects = []
+    for i in range(project_count):
+        project = {
+            "name": f"Project {seed}-{i}",
+            "sloc": rng.uniform(1000, 200000),
+            "reused": rng.uniform(0, 60),
+            "modified": rng.uniform(0, 100),
+            "effort": rng.uniform(1, 500),
+            "schedule": rng.uniform(1, 40),
+            "cost": round(rng.uniform(1000, 5000000), 2),
+            "hourly_rate": rng.uniform(20, 200),
+            "start_date": random_date(rng),
+        }
+        project["id"] = db.add_project(*project.values())
+        projects.append(project)
+
+    rows = [random_expense(rng, rng.choice(projects)["id"]) for _ in range(expense_count)]
+    expense_ids = db.add_expenses(rows)
+    expenses = [
+        {"id": expense_id, "project_id": row[0], "description": row[1], "amount": row[2], "category": row[3], "date": row[4]}
+        for expense_id, row in zip(expense_ids, rows)
+    ]
+    return projects, expenses
+
+
+def remaining_budget(project, expenses):
+    return project["cost"] - sum(e["amount"] for e in expenses if e["project_id"] == project["id"])
+
+
+def category_totals(expenses, project_id):
+    totals = {}
+    for expense in expenses:
+        if expense["project_id"] == project_id:
+            totals[expense["category"]] = totals.get(expense["category"], 0) + expense["amount"]
+    return totals
+
+
+def monthly_totals(expenses, project_id):
+    totals = {}
+    for expense in expenses:
+        if expense["project_id"] == project_id:
+            month = expense["date"][:7]
+            totals[month] = totals.get(month, 0) + expense["amount"]
+    return dict(sorted(totals.items()))
+
+
+def effort(sloc, reused, modified, scale_factors, effort_multipliers, a=2.94, b=0.91):
+    kloc = sloc / 1000 * (1 - reused / 100 + 0.4 * reused / 100 * (modified / 100))
+    product = 1.0
+    for multiplier in effort_multipliers:
+        product *= multiplier
+    return a * kloc ** (b + 0.01 * sum(scale_factors)) * product
+
+
+def schedule(effort_months, c=3.67, d=0.28):
+    return c * effort_months ** d
+
+
+def search(expenses, text=None, category=None, min_amount=None, max_amount=None, start_date=None, end_date=None):
+    """
+    Return the ids of the expenses a search should find, in any order.
+    """
+    words = text.lower().split() if text else []
+    found = set()
+    for expense in expenses:
+        tokens = expense["description"].lower().split()
+        if any(not any(token.startswith(word) for token in tokens) for word in words):
+            continue
+        if category is not None and expense["category"] != category:
+            continue
+        if min_amount is not None and expense["amount"] < min_amount:
+            continue
+        if max_amount is not None and expense["amount"] > max_amount:
+            continue
+        if start_date is not None and expense["date"] < start_date:
+            continue
+        if end_date is not None and expense["date"] > end_date:
+            continue
+        found.add(expense["id"])
+    return found
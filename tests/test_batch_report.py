@@ -0,0 +1,90 @@
+import json
+import os
+import sqlite3
+
+import pytest
+
+from database import Database
+
+pytest.importorskip("sklearn")
+pytest.importorskip("fpdf")
+
+from batch_report import output_paths, run_batch
+
+
+def create_unmigrated_database(db_path):
+    """
+    Create a database with the original schema: no status column, no archive
+    totals and no data versions.
+    """
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+        CREATE TABLE projects (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE,
+            sloc REAL NOT NULL,
+            reused REAL NOT NULL,
+            modified REAL NOT NULL,
+            effort REAL NOT NULL,
+            schedule REAL NOT NULL,
+            cost REAL NOT NULL,
+            hourly_rate REAL NOT NULL,
+            start_date TEXT NOT NULL
+        );
+        CREATE TABLE expenses (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            project_id INTEGER NOT NULL,
+            description TEXT NOT NULL,
+            amount REAL NOT NULL,
+            category TEXT NOT NULL,
+            date TEXT NOT NULL
+        );
+        INSERT INTO projects VALUES (1, 'Legacy', 1000, 0, 0, 1, 1, 5000, 10, '2020-01-01');
+        INSERT INTO expenses VALUES (1, 1, 'Laptop', 1200, 'Tools', '2020-02-01');
+        INSERT INTO expenses VALUES (2, 1, 'Licence', 300, 'Tools', '2020-03-01');
+    """)
+    conn.close()
+
+
+def read_forecast(output_dir, project):
+    with open(output_paths(output_dir, project)[1]) as f:
+        return json.load(f)
+
+
+def test_batch_migrates_old_databases(tmp_path):
+    db_path = str(tmp_path / "legacy.db")
+    output_dir = str(tmp_path / "reports")
+    create_unmigrated_database(db_path)
+
+    summary = run_batch(db_path, output_dir, processes=1)
+    assert (summary["done"], summary["failed"]) == (1, 0)
+    assert read_forecast(output_dir, {"id": 1, "name": "Legacy"})["remaining_budget"] == 3500
+
+
+def test_batch_rejects_missing_database(tmp_path):
+    db_path = tmp_path / "typo.db"
+    with pytest.raises(FileNotFoundError):
+        run_batch(str(db_path), str(tmp_path / "reports"), processes=1)
+    assert not db_path.exists()
+
+
+def test_batch_resumes_only_up_to_date_projects(tmp_path):
+    db_path = str(tmp_path / "projects.db")
+    output_dir = str(tmp_path / "reports")
+    db = Database(db_path)
+    first = db.add_project("First", 1000, 0, 0, 1, 1, 5000, 10, "2020-01-01")
+    second = db.add_project("Second", 1000, 0, 0, 1, 1, 5000, 10, "2020-01-01")
+
+    assert run_batch(db_path, output_dir, processes=1)["done"] == 2
+    # Without resume every project is regenerated.
+    assert run_batch(db_path, output_dir, processes=1)["done"] == 2
+
+    db.add_expense(second, "Laptop", 1200, "Tools", "2020-02-01")
+    summary = run_batch(db_path, output_dir, processes=1, resume=True)
+    assert (summary["skipped"], summary["done"]) == (1, 1)
+    assert [result["project"] for result in summary["results"]] == ["Second"]
+    assert read_forecast(output_dir, {"id": second, "name": "Second"})["remaining_budget"] == 3800
+
+    os.remove(output_paths(output_dir, {"id": first, "name": "First"})[0])
+    assert run_batch(db_path, output_dir, processes=1, resume=True)["done"] == 1
+    db.close()
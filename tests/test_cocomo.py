@@ -0,0 +1,149 @@
+import math
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from archive import ExpenseArchive
+from cocomo_calculator import COCOMOCalculator, HOURS_PER_MONTH
+import harness
+
+SEEDS = range(5)
+
+
+def random_inputs(rng, calculator):
+    ratings = {driver: rng.choice(harness.RATINGS) for driver in calculator.scale_factor_drivers + calculator.effort_multiplier_drivers}
+    scale_factors = {driver: calculator.scale_factors[ratings[driver]] for driver in calculator.scale_factor_drivers}
+    effort_multipliers = {driver: calculator.effort_multipliers[ratings[driver]] for driver in calculator.effort_multiplier_drivers}
+    size = (rng.uniform(500, 500000), rng.uniform(0, 100), rng.uniform(0, 100))
+    return size, ratings, scale_factors, effort_multipliers
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_effort_and_schedule_match_reference(seed):
+    rng = random.Random(seed)
+    calculator = COCOMOCalculator()
+    for _ in range(100):
+        size, _, scale_factors, effort_multipliers = random_inputs(rng, calculator)
+        effort = calculator.calculate_effort(*size, scale_factors, effort_multipliers)
+        expected = harness.effort(*size, scale_factors.values(), effort_multipliers.values())
+        assert effort == pytest.approx(expected, rel=1e-12)
+        assert calculator.calculate_schedule(effort) == pytest.approx(harness.schedule(expected), rel=1e-12)
+
+
+def test_custom_constants_match_reference():
+    calculator = COCOMOCalculator.from_profile({"a": 3.1, "b": 1.02, "c": 2.5, "d": 0.31})
+    effort = calculator.calculate_effort(42000, 10, 50, {"x": 1.15}, {"y": 0.88})
+    assert effort == pytest.approx(harness.effort(42000, 10, 50, [1.15], [0.88], a=3.1, b=1.02))
+    assert calculator.calculate_schedule(effort) == pytest.approx(harness.schedule(effort, c=2.5, d=0.31))
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_sweep_matches_scalar_calculator(seed):
+    pytest.importorskip("numpy")
+    from sensitivity import SensitivityAnalyzer
+
+    rng = random.Random(seed)
+    analyzer = SensitivityAnalyzer()
+    calculator = analyzer.calculator
+    sloc, reused, modified, hourly_rate = rng.uniform(500, 500000), rng.uniform(0, 100), rng.uniform(0, 100), rng.uniform(20, 200)
+    result = analyzer.sweep(sloc, reused, modified, hourly_rate)
+    assert result["cost"].size == len(harness.RATINGS) ** len(result["drivers"])
+
+    for _ in range(50):
+        position = tuple(rng.randrange(len(harness.RATINGS)) for _ in result["drivers"])
+        ratings = {driver: result["ratings"][driver][index] for driver, index in zip(result["drivers"], position)}
+        effort = harness.effort(
+            sloc, reused, modified,
+            [calculator.scale_factors[ratings[driver]] for driver in calculator.scale_factor_drivers],
+            [calculator.effort_multipliers[ratings[driver]] for driver in calculator.effort_multiplier_drivers],
+        )
+        assert result["effort"][position] == pytest.approx(effort, rel=1e-12)
+        assert result["schedule"][position] == pytest.approx(harness.schedule(effort), rel=1e-12)
+        assert result["cost"][position] == pytest.approx(effort * hourly_rate * HOURS_PER_MONTH, rel=1e-12)
+
+
+def test_sweep_subset_and_ranking():
+    pytest.importorskip("numpy")
+    from sensitivity import SensitivityAnalyzer
+
+    analyzer = SensitivityAnalyzer()
+    result = analyzer.sweep(20000, 0, 0, 100, {"Precedentedness": ["Low", "High"], "Database Size": ["Nominal"]})
+    assert result["cost"].shape == (2, 6, 6, 6, 1, 6)
+
+    cheapest = analyzer.ranked(result, count=5)
+    assert [row["cost"] for row in cheapest] == sorted(row["cost"] for row in cheapest)
+    assert cheapest[0]["cost"] == pytest.approx(result["cost"].min())
+    assert analyzer.ranked(result, count=1, largest=True)[0]["cost"] == pytest.approx(result["cost"].max())
+
+
+def test_sweep_rejects_unknown_drivers_and_empty_ratings():
+    pytest.importorskip("numpy")
+    from sensitivity import SensitivityAnalyzer
+
+    analyzer = SensitivityAnalyzer()
+    with pytest.raises(ValueError, match="Precedentednes"):
+        analyzer.sweep(20000, 0, 0, 100, {"Precedentednes": ["Low"]})
+    with pytest.raises(ValueError, match="Database Size"):
+        analyzer.sweep(20000, 0, 0, 100, {"Database Size": []})
+
+
+def test_tornado_baseline_matches_scalar():
+    pytest.importorskip("numpy")
+    from sensitivity import SensitivityAnalyzer
+
+    analyzer = SensitivityAnalyzer()
+    baseline_cost, rows = analyzer.tornado(8000, 15, 0, 100)
+    nominal = harness.effort(8000, 15, 0, [1.0] * 3, [1.0] * 3) * 100 * HOURS_PER_MONTH
+    assert baseline_cost == pytest.approx(nominal)
+    assert [row["swing"] for row in rows] == sorted((row["swing"] for row in rows), reverse=True)
+    for row in rows:
+        assert row["low_cost"] <= baseline_cost <= row["high_cost"]
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_calibration_recovers_constants(db, tmp_path, seed):
+    pytest.importorskip("scipy")
+    from calibration import calibrate
+
+    rng = random.Random(seed)
+    # Half of the projects were estimated with an earlier calibration
+    estimators = [COCOMOCalculator(), COCOMOCalculator(a=rng.uniform(2, 4), b=rng.uniform(0.85, 1.05))]
+    actual = COCOMOCalculator(a=rng.uniform(2, 4), b=rng.uniform(0.85, 1.05), c=rng.uniform(2.5, 4), d=rng.uniform(0.25, 0.35))
+    rows = []
+    for i in range(200):
+        estimator = estimators[i % 2]
+        size, _, scale_factors, effort_multipliers = random_inputs(rng, estimator)
+        estimated = estimator.calculate_effort(*size, scale_factors, effort_multipliers)
+        effort = actual.calculate_effort(*size, scale_factors, effort_multipliers)
+        constants = (estimator.a, estimator.b) if i % 2 else (None, None)
+        project_id = db.add_project(f"p{i}", *size, estimated, 1, estimated * 100 * HOURS_PER_MONTH, 100, "2010-01-01", *constants)
+        months = actual.calculate_schedule(effort)
+        end_date = date(2010, 1, 1) + timedelta(days=round(months * 365.25 / 12))
+        rows.append((project_id, "work", effort * 100 * HOURS_PER_MONTH, "Development", end_date.isoformat()))
+        db.close_project(project_id)
+    db.add_expenses(rows)
+
+    profile = calibrate(db, archive=ExpenseArchive(db, str(tmp_path)))
+    assert profile["a"] == pytest.approx(actual.a, rel=1e-6)
+    assert profile["b"] == pytest.approx(actual.b, rel=1e-6)
+    # Durations are rounded to whole days
+    assert profile["c"] == pytest.approx(actual.c, rel=1e-2)
+    assert profile["d"] == pytest.approx(actual.d, rel=1e-2)
+    assert db.get_calibration_profile("default")["version"] == profile["version"] == 1
+    assert db.get_calibration_profile_names() == ["default"]
+
+
+def test_calibration_skips_unparseable_start_dates(db, tmp_path):
+    pytest.importorskip("scipy")
+    from calibration import load_history
+
+    for i, start_date in enumerate(["2020-01-01", "01/02/2024"]):
+        project_id = db.add_project(f"p{i}", 10000, 0, 0, 10, 2, 160000, 100, start_date)
+        db.add_expense(project_id, "work", 160000, "Development", "2020-07-01")
+        db.close_project(project_id)
+
+    history = load_history(db, archive=ExpenseArchive(db, str(tmp_path)))
+    assert list(history["actual_effort"]) == [10.0, 10.0]
+    assert history["actual_months"][0] > 0
+    assert math.isnan(history["actual_months"][1])
@@ -0,0 +1,254 @@
+import random
+import sqlite3
+import threading
+
+import pytest
+
+from archive import ExpenseArchive
+from database import Database, SCHEMA_VERSION
+from ingest import ExpenseWriter
+import harness
+
+SEEDS = range(5)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_remaining_budget_matches_reference(db, seed):
+    projects, expenses = harness.populate(db, seed)
+    for project in projects:
+        assert db.get_remaining_budget(project["name"]) == pytest.approx(harness.remaining_budget(project, expenses))
+
+
+def test_remaining_budget_of_unknown_project_is_zero(db):
+    assert db.get_remaining_budget("missing") == 0.0
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_project_summaries_match_reference(db, seed):
+    projects, expenses = harness.populate(db, seed)
+    summaries = {summary["id"]: summary for summary in db.get_project_summaries()}
+    assert set(summaries) == {project["id"] for project in projects}
+    for project in projects:
+        assert summaries[project["id"]]["cost"] == project["cost"]
+        assert summaries[project["id"]]["remaining"] == pytest.approx(harness.remaining_budget(project, expenses))
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_category_totals_match_reference(db, seed):
+    projects, expenses = harness.populate(db, seed)
+    for project in projects:
+        expected = harness.category_totals(expenses, project["id"])
+        assert db.get_category_totals(project["id"]) == pytest.approx(expected)
+        # Same first-seen order as summing the expense list
+        assert list(db.get_category_totals(project["id"])) == list(expected)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_monthly_totals_match_reference(db, seed):
+    projects, expenses = harness.populate(db, seed)
+    for project in projects:
+        expected = harness.monthly_totals(expenses, project["id"])
+        monthly = db.get_monthly_totals(project["id"])
+        assert list(monthly) == list(expected)
+        assert list(monthly.values()) == pytest.approx(list(expected.values()))
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_archiving_keeps_totals_exact(db, tmp_path, seed):
+    projects, expenses = harness.populate(db, seed)
+    rng = random.Random(seed)
+    for project in rng.sample(projects, 5):
+        db.close_project(project["id"])
+    before = {project["name"]: db.get_remaining_budget(project["name"]) for project in projects}
+
+    archive = ExpenseArchive(db, str(tmp_path))
+    cutoff = harness.random_date(rng)
+    moved = archive.archive_expenses(cutoff)
+    assert sum(moved.values()) + len(db.conn.execute("SELECT id FROM expenses").fetchall()) == len(expenses)
+    # Running it again finds nothing left to move
+    assert archive.archive_expenses(cutoff) == {}
+
+    for project in projects:
+        assert db.get_remaining_budget(project["name"]) == pytest.approx(before[project["name"]])
+    history = archive.get_expense_history()
+    assert sorted(expense["id"] for expense in history) == sorted(expense["id"] for expense in expenses)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_search_matches_reference(db, seed):
+    projects, expenses = harness.populate(db, seed)
+    rng = random.Random(seed)
+    for _ in range(10):
+        filters = {
+            "text": rng.choice([None, rng.choice(harness.WORDS), rng.choice(harness.WORDS)[:3]]),
+            "category": rng.choice([None] + harness.CATEGORIES),
+            "min_amount": rng.choice([None, 100.0]),
+            "max_amount": rng.choice([None, 2500.0]),
+            "start_date": rng.choice([None, "2020-01-01"]),
+            "end_date": rng.choice([None, "2022-12-31"]),
+        }
+        results = db.search_expenses(**filters, limit=len(expenses))
+        assert {expense["id"] for expense in results} == harness.search(expenses, **filters)
+
+
+def test_search_paginates_without_overlap(db):
+    harness.populate(db, 0, expense_count=200)
+    pages = [db.search_expenses("laptop", limit=10, offset=offset) for offset in range(0, 200, 10)]
+    ids = [expense["id"] for page in pages for expense in page]
+    assert len(ids) == len(set(ids))
+
+
+def test_search_ignores_fts_syntax(db):
+    harness.populate(db, 0, expense_count=100)
+    assert db.search_expenses('"laptop*') == db.search_expenses("laptop")
+    assert db.search_expenses('NEAR(laptop') == db.search_expenses("near laptop")
+
+
+def test_search_falls_back_to_like_without_fts(tmp_path):
+    db_path = str(tmp_path / "nofts.db")
+    db = Database(db_path)
+    db.conn.executescript("""
+        DROP TRIGGER trg_expenses_fts_insert;
+        DROP TRIGGER trg_expenses_fts_delete;
+        DROP TRIGGER trg_expenses_fts_update;
+        DROP TABLE expenses_fts;
+    """)
+    db.close()
+
+    db = Database(db_path)
+    project_id = db.add_project("p", 1000, 0, 0, 1, 1, 100000, 10, "2020-01-01")
+    for description, date in [("Laptop stand", "2024-01-01"), ("Team laptop", "2024-02-01"), ("Train", "2024-03-01")]:
+        db.add_expense(project_id, description, 10.0, "Tools", date)
+
+    assert [expense["description"] for expense in db.search_expenses("LAPTOP")] == ["Team laptop", "Laptop stand"]
+    assert [expense["description"] for expense in db.search_expenses("lap sta")] == ["Laptop stand"]
+    assert db.search_expenses("laptop", start_date="2024-01-15")[0]["project_name"] == "p"
+    db.close()
+
+
+def test_add_expenses_matches_add_expense(db):
+    rng = random.Random(7)
+    single = Database(":memory:")
+    project_id = db.add_project("p", 1000, 0, 0, 1, 1, 100000, 10, "2020-01-01")
+    single.add_project("p", 1000, 0, 0, 1, 1, 100000, 10, "2020-01-01")
+    rows = [harness.random_expense(rng, project_id) for _ in range(100)]
+
+    db.add_expenses(rows)
+    for row in rows:
+        single.add_expense(*row)
+
+    assert db.get_expenses(project_id) == single.get_expenses(project_id)
+    assert db.get_project_version(project_id) == single.get_project_version(project_id)
+
+
+def test_expense_writer_commits_every_expense(tmp_path):
+    db_path = str(tmp_path / "writer.db")
+    db = Database(db_path)
+    project_id = db.add_project("p", 1000, 0, 0, 1, 1, 100000, 10, "2020-01-01")
+    rng = random.Random(3)
+    rows = [harness.random_expense(rng, project_id) for _ in range(2000)]
+
+    with ExpenseWriter(db_path, batch_size=128) as writer:
+        futures = [writer.submit(*row) for row in rows]
+        expense_ids = [future.result() for future in futures]
+
+    assert len(set(expense_ids)) == len(rows)
+    stored = {expense["id"]: expense for expense in db.get_expenses(project_id)}
+    assert [stored[expense_id]["amount"] for expense_id in expense_ids] == [row[2] for row in rows]
+    db.close()
+
+
+def test_expense_writer_fails_only_the_bad_expense(tmp_path):
+    db_path = str(tmp_path / "writer.db")
+    db = Database(db_path)
+    project_id = db.add_project("p", 1000, 0, 0, 1, 1, 100000, 10, "2020-01-01")
+
+    with ExpenseWriter(db_path, batch_size=10, max_delay=1) as writer:
+        futures = [writer.submit(project_id, description, 1.0, "Tools", "2024-01-01") for description in ["a", None, "c"]]
+        assert futures[0].result() < futures[2].result()
+        with pytest.raises(sqlite3.IntegrityError):
+            futures[1].result()
+
+    assert [expense["description"] for expense in db.get_expenses(project_id)] == ["a", "c"]
+    db.close()
+
+
+def test_expense_writer_failure_fails_pending_and_new_expenses(tmp_path):
+    writer = ExpenseWriter(str(tmp_path / "missing" / "writer.db")).start()
+    future = writer.submit(1, "a", 1.0, "Tools", "2024-01-01")
+    with pytest.raises(sqlite3.OperationalError):
+        future.result(timeout=5)
+    with pytest.raises(RuntimeError):
+        writer.submit(1, "b", 1.0, "Tools", "2024-01-01")
+    writer.stop()
+
+
+def test_expense_writer_rejects_expenses_after_stop(tmp_path):
+    db_path = str(tmp_path / "writer.db")
+    db = Database(db_path)
+    project_id = db.add_project("p", 1000, 0, 0, 1, 1, 100000, 10, "2020-01-01")
+    expense = (project_id, "a", 1.0, "Tools", "2024-01-01")
+
+    writer = ExpenseWriter(db_path).start()
+    futures = [writer.submit(*expense) for _ in range(5000)]
+    stopper = threading.Thread(target=writer.stop)
+    stopper.start()
+    while True:
+        try:
+            futures.append(writer.submit(*expense, timeout=5))
+        except RuntimeError:
+            break
+    stopper.join()
+
+    expense_ids = [future.result(timeout=5) for future in futures]
+    assert len(db.get_expenses(project_id)) == len(set(expense_ids)) == len(futures)
+    with pytest.raises(RuntimeError):
+        writer.submit(*expense)
+    db.close()
+
+
+def test_change_events_carry_new_rows(db):
+    events = []
+    db.subscribe(events.append)
+    project_id = db.add_project("p", 1000, 0, 0, 1, 1, 100000, 10, "2020-01-01")
+    db.add_expenses([(project_id, "a", 1.0, "Tools", "2024-01-01"), (project_id, "b", 2.0, "Tools", "2024-01-02")])
+    db.close_project(project_id)
+    db.unsubscribe(events.append)
+    db.add_expense(project_id, "c", 3.0, "Tools", "2024-01-03")
+
+    assert [event["type"] for event in events] == ["project_added", "expenses_added", "project_changed"]
+    assert [expense["description"] for expense in events[1]["expenses"]] == ["a", "b"]
+    assert [event["version"] for event in events] == [1, 3, 4]
+    assert db.get_project_version(project_id) == 5
+
+
+def test_writes_skip_event_queries_without_listeners(db):
+    statements = []
+    db.conn.set_trace_callback(statements.append)
+    project_id = db.add_project("p", 1000, 0, 0, 1, 1, 100000, 10, "2020-01-01")
+    db.add_expenses([(project_id, "a", 1.0, "Tools", "2024-01-01")])
+    db.conn.set_trace_callback(None)
+
+    assert not [statement for statement in statements if statement.lstrip().upper().startswith("SELECT")]
+
+
+def test_schema_check_skipped_when_current(tmp_path):
+    db_path = str(tmp_path / "schema.db")
+    db = Database(db_path)
+    assert db.conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+    db.conn.execute("DELETE FROM categories WHERE name = 'Travel'")
+    db.conn.commit()
+    db.close()
+
+    reopened = Database(db_path)
+    assert "Travel" not in reopened.get_categories()
+    reopened.close()
+
+
+def test_database_connects_lazily(tmp_path):
+    db_path = tmp_path / "lazy.db"
+    db = Database(str(db_path))
+    assert not db_path.exists()
+    db.get_categories()
+    assert db_path.exists()
+    db.close()
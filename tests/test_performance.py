@@ -0,0 +1,94 @@
+"""
+Performance budgets on an in-memory database.
+
+The limits are generous for a laptop; set PERF_BUDGET_FACTOR to scale them
+on slower machines.
+"""
+import os
+import random
+import time
+
+import pytest
+
+from database import Database
+import harness
+
+BUDGET_FACTOR = float(os.environ.get("PERF_BUDGET_FACTOR", "1"))
+
+
+def best_time(function, repeat=3):
+    """
+    Best wall-clock time of several runs, in milliseconds.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+@pytest.fixture(scope="module")
+def portfolio():
+    db = Database(":memory:")
+    projects, expenses = harness.populate(db, 42, project_count=1000, expense_count=50000)
+    yield db, projects, expenses
+    db.close()
+
+
+def test_dashboard_summaries_budget(portfolio):
+    db, projects, _ = portfolio
+    elapsed = best_time(db.get_project_summaries)
+    assert elapsed < 100 * BUDGET_FACTOR, f"get_project_summaries took {elapsed:.1f} ms for {len(projects)} projects"
+
+
+def test_remaining_budget_budget(portfolio):
+    db, projects, _ = portfolio
+    names = [project["name"] for project in projects[:200]]
+    elapsed = best_time(lambda: [db.get_remaining_budget(name) for name in names])
+    assert elapsed / len(names) < 1 * BUDGET_FACTOR, f"get_remaining_budget took {elapsed / len(names):.3f} ms per project"
+
+
+def test_project_aggregates_budget(portfolio):
+    db, projects, _ = portfolio
+    project_ids = [project["id"] for project in projects[:200]]
+    elapsed = best_time(lambda: [(db.get_category_totals(pid), db.get_monthly_totals(pid)) for pid in project_ids])
+    assert elapsed / len(project_ids) < 1 * BUDGET_FACTOR, f"aggregates took {elapsed / len(project_ids):.3f} ms per project"
+
+
+def test_search_budget(portfolio):
+    db, _, _ = portfolio
+    elapsed = best_time(lambda: db.search_expenses("hotel", category="Travel", min_amount=100, start_date="2020-01-01", limit=50))
+    assert elapsed < 100 * BUDGET_FACTOR, f"search_expenses took {elapsed:.1f} ms"
+
+
+def test_bulk_insert_budget(db):
+    project_id = db.add_project("p", 1000, 0, 0, 1, 1, 1000000, 10, "2020-01-01")
+    rng = random.Random(1)
+    rows = [harness.random_expense(rng, project_id) for _ in range(10000)]
+    started = time.perf_counter()
+    db.add_expenses(rows)
+    elapsed = (time.perf_counter() - started) * 1000
+    assert elapsed < 1000 * BUDGET_FACTOR, f"add_expenses took {elapsed:.1f} ms for {len(rows)} expenses"
+
+
+def test_sweep_budget():
+    pytest.importorskip("numpy")
+    from sensitivity import SensitivityAnalyzer
+
+    analyzer = SensitivityAnalyzer()
+    elapsed = best_time(lambda: analyzer.sweep(50000, 20, 30, 100))
+    assert elapsed < 50 * BUDGET_FACTOR, f"sweep of 6^6 combinations took {elapsed:.1f} ms"
+
+
+def test_calibration_budget(db, tmp_path):
+    pytest.importorskip("scipy")
+    from archive import ExpenseArchive
+    from calibration import calibrate
+
+    projects, _ = harness.populate(db, 7, project_count=2000, expense_count=20000)
+    db.conn.execute("UPDATE projects SET status = 'closed'")
+    db.conn.commit()
+    archive = ExpenseArchive(db, str(tmp_path))
+    elapsed = best_time(lambda: calibrate(db, archive=archive, save=False))
+    assert elapsed < 1000 * BUDGET_FACTOR, f"calibration took {elapsed:.1f} ms for {len(projects)} projects"
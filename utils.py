@@ -1,4 +1,5 @@
 import logging
+from collections import deque
 
 def setup_logging():
     logging.basicConfig(
@@ -9,4 +10,25 @@ def setup_logging():
             logging.StreamHandler()
         ],
     )
-    logging.info("Logging is set up.")
\ No newline at end of file
+    logging.info("Logging is set up.")
+
+
+def deliver_changes(widget, db, handler, interval_ms=250):
+    """
+    Subscribe handler to the change events of db and run it on the Tk main loop.
+
+    Writes may happen on other threads (for example the ExpenseWriter), so the
+    events are queued and drained from a periodic widget.after callback.
+    """
+    pending = deque()
+    db.subscribe(pending.append)
+
+    def drain():
+        while pending:
+            try:
+                handler(pending.popleft())
+            except Exception as e:
+                logging.error(f"Error applying change event: {e}")
+        widget.after(interval_ms, drain)
+
+    widget.after(interval_ms, drain)